@@ -0,0 +1,191 @@
+"""
+Measure how long cards and banners take to render and encode.
+
+Fonts, backgrounds and artworks are generated in a temporary directory, no production asset
+or network access is needed. Each variant runs in a fresh process: cold renders start from
+empty caches, warm renders reuse the caches filled by the previous ones. The results are
+printed as JSON, latencies are in milliseconds.
+
+    python -m benchmarks.cards [--runs 30] [--cold-runs 10] [--scale 1.0] [--output file]
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable
+
+from PIL import Image, ImageFont
+
+from carfigures.core.utils import imagers
+
+SHORT_DESCRIPTION = "Gains speed on straight lines and overtakes the opponent."
+LONG_DESCRIPTION = " ".join([SHORT_DESCRIPTION] * 8)
+
+
+def generate_assets(root: Path) -> dict[str, str]:
+    """
+    Write the synthetic assets in `root` and return their paths. Images mix gradients and
+    noise so that they compress like real artworks rather than flat colors.
+    """
+
+    def image(name: str, size: tuple[int, int], mode: str = "RGB") -> str:
+        gradient = Image.linear_gradient("L").resize(size)
+        # low frequency noise, real artworks are not made of random pixels either
+        noise = Image.effect_noise((size[0] // 16, size[1] // 16), 64).resize(
+            size, Image.Resampling.BICUBIC
+        )
+        channels = [gradient, noise, Image.radial_gradient("L").resize(size)]
+        if mode == "RGBA":
+            channels.append(Image.new("L", size, 200))
+        path = root / name
+        Image.merge(mode, channels).save(path)
+        return str(path)
+
+    font = root / "font.ttf"
+    font.write_bytes(ImageFont.load_default().font_bytes)
+    return {
+        "font": str(font),
+        "album": image("album.png", (1428, 2000)),
+        "exclusive": image("exclusive.png", (1428, 2000)),
+        "event": image("event.png", (1428, 2000)),
+        "banner": image("banner.png", (1920, 1080)),
+        "artwork": image("artwork.png", (1600, 1000)),
+        "icon": image("icon.png", (512, 512), "RGBA"),
+    }
+
+
+def card_template(
+    assets: dict[str, str], background: str, description: str
+) -> imagers.CardTemplate:
+    font = assets["font"]
+    return imagers.CardTemplate(
+        background=assets[background],
+        artwork=assets["artwork"],
+        icon=assets["icon"],
+        title_font=font,
+        capacity_name_font=font,
+        capacity_description_font=font,
+        stats_font=font,
+        credits_font=font,
+        title="Benchmark Car",
+        capacity_name="Slipstream",
+        capacity_description=description,
+        credits="Benchmark suite",
+    )
+
+
+def banner_template(assets: dict[str, str]) -> imagers.BannerTemplate:
+    font = assets["font"]
+    return imagers.BannerTemplate(
+        banner=assets["banner"],
+        title_font=font,
+        description_font=font,
+        status_font=font,
+        credits_font=font,
+        name="Benchmark Event",
+        description=LONG_DESCRIPTION,
+        live=True,
+    )
+
+
+def variants(assets: dict[str, str], scale: float) -> dict[str, Callable[[], Image.Image]]:
+    plain = card_template(assets, "album", SHORT_DESCRIPTION)
+    exclusive = card_template(assets, "exclusive", SHORT_DESCRIPTION)
+    event = card_template(assets, "event", SHORT_DESCRIPTION)
+    long = card_template(assets, "album", LONG_DESCRIPTION)
+    banner = banner_template(assets)
+    return {
+        "plain": lambda: imagers.render_card(plain, 1250, 740, scale),
+        "exclusive": lambda: imagers.render_card(exclusive, 1250, 740, scale),
+        "event": lambda: imagers.render_card(event, 1250, 740, scale),
+        "long_description": lambda: imagers.render_card(long, 1250, 740, scale),
+        "banner": lambda: imagers.render_banner(banner),
+    }
+
+
+def percentiles(timings: list[float]) -> dict[str, float]:
+    timings = [x * 1000 for x in timings]
+    if len(timings) < 2:
+        timings = timings * 2
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49], 3),
+        "p95": round(cuts[94], 3),
+        "p99": round(cuts[98], 3),
+        "min": round(min(timings), 3),
+        "max": round(max(timings), 3),
+    }
+
+
+def sample(render: Callable[[], Image.Image], runs: int, cold: bool) -> tuple[dict, int]:
+    encoder = imagers.Encoder.from_settings()
+    render_timings: list[float] = []
+    encode_timings: list[float] = []
+    size = 0
+    for _ in range(runs):
+        if cold:
+            imagers.load_font.cache_clear()
+            imagers.images.clear()
+        start = time.perf_counter()
+        image = render()
+        rendered = time.perf_counter()
+        buffer = encoder.encode(image)
+        encode_timings.append(time.perf_counter() - rendered)
+        render_timings.append(rendered - start)
+        size = len(buffer.getvalue())
+        image.close()
+    return {"render": percentiles(render_timings), "encode": percentiles(encode_timings)}, size
+
+
+def run_variant(root: str, name: str, scale: float, runs: int, cold_runs: int) -> dict:
+    # executed in a fresh process for each variant, to isolate caches and peak memory
+    assets = json.loads((Path(root) / "assets.json").read_text())
+    render = variants(assets, scale)[name]
+    cold, size = sample(render, cold_runs, cold=True)
+    warm, _ = sample(render, runs, cold=False)
+    return {
+        "cold": cold,
+        "warm": warm,
+        "encoded_bytes": size,
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=30, help="warm renders per variant")
+    parser.add_argument("--cold-runs", type=int, default=10, help="cold renders per variant")
+    parser.add_argument("--scale", type=float, default=1.0, help="scale of the cards")
+    parser.add_argument("--output", type=Path, help="write the results there instead")
+    args = parser.parse_args()
+
+    results = {"scale": args.scale, "runs": args.runs, "cold_runs": args.cold_runs}
+    with tempfile.TemporaryDirectory(prefix="carfigures-bench-") as root:
+        assets = generate_assets(Path(root))
+        (Path(root) / "assets.json").write_text(json.dumps(assets))
+        names = variants(assets, args.scale).keys()
+        results["variants"] = {}
+        for name in names:
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+                future = executor.submit(
+                    run_variant, root, name, args.scale, args.runs, args.cold_runs
+                )
+                results["variants"][name] = future.result()
+            print(f"{name} done", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Fire many simultaneous catch submissions at spawns and check that each spawn is caught once.
+
+The real `CarFigureNamePrompt.on_submit` runs with fake interactions answering after random
+delays, so that the submissions interleave like under load, and catches are recorded instead of
+being written. With `--db-url`, concurrent `CarInstance.catch` calls sharing a spawn token are
+also sent to a PostgreSQL database, which must accept only one of them per token. The
+database must have the schema of the bot, a test database is advised since players and
+instances are created.
+
+    python -m benchmarks.claims [--spawns 50] [--submissions 500] [--db-url postgres://...]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from tortoise import Tortoise
+
+from carfigures.core.models import Car, CarInstance
+from carfigures.packages.carfigures.carfigure import CarFigure
+from carfigures.packages.carfigures.components import CarFigureNamePrompt
+from carfigures.settings import settings
+
+
+async def pause():
+    await asyncio.sleep(random.random() * 0.005)
+
+
+class FakeFollowup:
+    def __init__(self):
+        self.messages: list[str] = []
+
+    async def send(self, content: str, **kwargs):
+        await pause()
+        self.messages.append(content)
+
+    async def edit_message(self, message_id: int, **kwargs):
+        await pause()
+
+
+class FakeResponse:
+    async def defer(self, **kwargs):
+        await pause()
+
+
+class RecordingPrompt(CarFigureNamePrompt):
+    """
+    Prompt counting the catches instead of writing them to the database.
+    """
+
+    catches: Counter[int] = Counter()
+
+    async def catch_car(self, bot, user):
+        await pause()
+        self.catches[id(self.car)] += 1
+        instance = SimpleNamespace(
+            pk=len(self.catches),
+            horsepowerBonus=0,
+            weightBonus=0,
+            exclusive_card=None,
+            event_card=None,
+        )
+        return instance, False
+
+
+async def submit(car: CarFigure, user_id: int, name: str) -> FakeFollowup:
+    prompt = RecordingPrompt(car, SimpleNamespace(disabled=False, view=None))
+    prompt.name._value = name  # what discord.py fills from the modal submission
+    followup = FakeFollowup()
+    interaction = SimpleNamespace(
+        response=FakeResponse(),
+        followup=followup,
+        user=SimpleNamespace(id=user_id, mention=f"<@{user_id}>"),
+        client=None,
+    )
+    await prompt.on_submit(interaction)  # type: ignore
+    return followup
+
+
+async def stress_prompts(spawns: int, submissions: int) -> bool:
+    model = Car(fullName="Benchmark", catchNames="bench;mark")
+    cars = [CarFigure(model) for _ in range(spawns)]
+    for car in cars:
+        car.message = SimpleNamespace(id=0)  # type: ignore
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            submit(car, user_id, random.choice(("Benchmark", "bench", "wrong")))
+            for car in cars
+            for user_id in range(submissions // spawns)
+        )
+    )
+    duration = time.perf_counter() - start
+    counts = Counter(RecordingPrompt.catches[id(car)] for car in cars)
+    print(
+        f"{spawns} spawns, {submissions // spawns * spawns} submissions in {duration:.2f}s, "
+        f"catches per spawn: {dict(counts)}"
+    )
+    return set(counts) == {1}
+
+
+async def stress_database(db_url: str, spawns: int, submissions: int) -> bool:
+    await Tortoise.init(db_url=db_url, modules={"models": ["carfigures.core.models"]})
+    try:
+        car = await Car.first()
+        if car is None:
+            print("The database has no car to catch")
+            return False
+        winners: Counter[int] = Counter()
+        for _ in range(spawns):
+            spawn = CarFigure(car)
+            results = await asyncio.gather(
+                *(
+                    CarInstance.catch(
+                        10**17 + user_id, car=car, spawnToken=spawn.token, server=None
+                    )
+                    for user_id in range(submissions // spawns)
+                )
+            )
+            winners[sum(result is not None for result in results)] += 1
+        print(f"database, winners per spawn: {dict(winners)}")
+        return set(winners) == {1}
+    finally:
+        await Tortoise.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spawns", type=int, default=50)
+    parser.add_argument("--submissions", type=int, default=500, help="in total")
+    parser.add_argument("--db-url", help="PostgreSQL database to check the spawn tokens on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    settings.wrong_name_messages.rebuild(["Wrong name!"], [1])
+    ok = asyncio.run(stress_prompts(args.spawns, args.submissions))
+    if args.db_url:
+        ok = asyncio.run(stress_database(args.db_url, args.spawns, args.submissions)) and ok
+    if not ok:
+        print("Some spawns were caught more than once, or never")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare the encoding options of rendered images.
+
+Each image is encoded with every option of `carfigures.core.utils.imagers.Encoder`, and the
+median encode time and output size are reported. Defaults to the demo assets, other images
+can be given on the command line.
+
+    python -m benchmarks.encoding [images...] [--runs 5]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from carfigures.core.utils.imagers import Encoder
+
+DEMO_ASSETS = sorted(Path("assets/demos").glob("*.png"))
+
+ENCODERS = {
+    "png level 1": Encoder("png", compress_level=1),
+    "png level 6 (default)": Encoder("png", compress_level=6),
+    "png level 9": Encoder("png", compress_level=9),
+    "png quantized": Encoder("png", compress_level=6, quantize=True),
+    "webp lossless": Encoder("webp", lossless=True, quality=50),
+    "webp quality 90": Encoder("webp", quality=90),
+    "webp quality 75": Encoder("webp", quality=75),
+}
+
+
+def measure(image: Image.Image, encoder: Encoder, runs: int) -> tuple[float, int]:
+    timings = []
+    size = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        buffer = encoder.encode(image)
+        timings.append(time.perf_counter() - start)
+        size = len(buffer.getvalue())
+    return statistics.median(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("images", nargs="*", type=Path, default=DEMO_ASSETS)
+    parser.add_argument("--runs", type=int, default=5, help="encodes per image and option")
+    args = parser.parse_args()
+
+    for path in args.images:
+        # cards and banners are rendered in RGBA
+        image = Image.open(path).convert("RGBA")
+        print(f"{path} ({image.width}x{image.height})")
+        for name, encoder in ENCODERS.items():
+            duration, size = measure(image, encoder, args.runs)
+            print(f"  {name:<24}{duration * 1000:>9.1f} ms{size / 1024:>10.1f} KiB")
+        image.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Check and time the alias sampler used to pick the spawned cars and the catch rewards.
+
+First draws many samples from a catalog of random rarities and runs a chi-squared
+goodness-of-fit test against the configured rarities, then does the same for the exclusive
+cards of a rebirth tier and the event cards of the windows of an event schedule, exiting with
+an error if a distribution doesn't match. Then compares the cost of a draw with
+`random.choices` as the catalog grows.
+
+    python -m benchmarks.sampling [--draws 1000000] [--seed 0]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from carfigures.core.utils.rewards import RewardSampler
+from carfigures.core.utils.sampling import AliasSampler
+
+
+def chi_squared_critical(degrees: int, z: float = 3.09) -> float:
+    """
+    Wilson-Hilferty approximation of the chi-squared quantile, z=3.09 is the 99.9th percentile.
+    """
+    factor = 2 / (9 * degrees)
+    return degrees * (1 - factor + z * math.sqrt(factor)) ** 3
+
+
+def goodness_of_fit(name: str, counts: Counter, weights: dict) -> bool:
+    """
+    Chi-squared test of the drawn `counts` against the relative `weights` of the items.
+    """
+    draws = sum(counts.values())
+    total = sum(weights.values())
+    statistic = 0.0
+    degrees = -1
+    for item in counts.keys() - weights.keys():
+        print(f"{name}: {item} was drawn {counts[item]} times but can't be")
+        return False
+    for item, weight in weights.items():
+        expected = draws * weight / total
+        if expected == 0:
+            if counts[item]:
+                print(f"{name}: {item} has a weight of 0 but was drawn {counts[item]} times")
+                return False
+            continue
+        statistic += (counts[item] - expected) ** 2 / expected
+        degrees += 1
+    if degrees < 1:
+        return True
+    critical = chi_squared_critical(degrees)
+    print(
+        f"{name}: chi-squared {statistic:.1f} for {degrees} degrees of freedom, "
+        f"limit {critical:.1f}"
+    )
+    return statistic < critical
+
+
+def check_distribution(draws: int) -> bool:
+    rarities = [round(random.uniform(0.1, 50), 2) for _ in range(40)] + [0.0, 0.05]
+    sampler = AliasSampler(range(len(rarities)), rarities)
+    counts = Counter(sampler.sample_many(draws // 2))
+    counts.update(sampler.sample() for _ in range(draws - draws // 2))
+    return goodness_of_fit("cars", counts, dict(enumerate(rarities)))
+
+
+@dataclass(eq=False)
+class FakeCard:
+    """
+    Exclusive or event, hashed by identity like the models.
+    """
+
+    name: str
+    rarity: float
+    rebirthRequired: int = 0
+    startDate: datetime | None = None
+    endDate: datetime | None = None
+
+
+def check_rewards(draws: int) -> bool:
+    """
+    Compare the catch rewards with the odds computed by hand: each card weighs its rarity, the
+    common card (`None`) weighs what the cards leave.
+    """
+    exclusives = [
+        FakeCard(f"exclusive {i}", random.uniform(0, 1), rebirthRequired=i % 4) for i in range(12)
+    ]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    events = [
+        FakeCard(
+            f"event {i}",
+            random.uniform(0, 1),
+            startDate=start + timedelta(days=random.randint(0, 20)),
+            endDate=start + timedelta(days=random.randint(21, 40)),
+        )
+        for i in range(6)
+    ]
+    rewards = RewardSampler()
+    rewards.rebuild(exclusives, events)  # type: ignore
+
+    def odds(cards: list[FakeCard]) -> dict:
+        return {**{card: card.rarity for card in cards}, None: sum(1 - x.rarity for x in cards)}
+
+    ok = True
+    for rebirths in (0, 2, 10):
+        counts = Counter(rewards.exclusive(rebirths) for _ in range(draws // 10))
+        unlocked = [x for x in exclusives if x.rebirthRequired <= rebirths]
+        ok = goodness_of_fit(f"exclusives, {rebirths} rebirths", counts, odds(unlocked)) and ok
+
+    # draws in time order like the catches, so that the windows are swapped at their bounds
+    for day in range(-1, 42, 6):
+        now = start + timedelta(days=day, hours=random.randint(0, 23))
+        running = [x for x in events if x.startDate <= now < x.endDate]
+        counts = Counter(rewards.event(now) for _ in range(draws // 20))
+        weights = odds(running) if running else {None: 1}
+        ok = goodness_of_fit(f"events, day {day}", counts, weights) and ok
+    return ok
+
+
+def time_draws(size: int, draws: int = 100_000):
+    rarities = [random.uniform(0.1, 50) for _ in range(size)]
+    population = list(range(size))
+
+    start = time.perf_counter()
+    for _ in range(draws):
+        random.choices(population, weights=rarities, k=1)
+    choices = (time.perf_counter() - start) / draws
+
+    sampler = AliasSampler(population, rarities)
+    start = time.perf_counter()
+    for _ in range(draws):
+        sampler.sample()
+    alias = (time.perf_counter() - start) / draws
+    print(f"{size:>7} cars   choices {choices * 1e6:>9.2f} µs   alias {alias * 1e6:>6.2f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--draws", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if not check_distribution(args.draws) or not check_rewards(args.draws):
+        print("The sampled distribution doesn't match the rarities")
+        sys.exit(1)
+    for size in (10, 100, 1000, 10_000):
+        time_draws(size, 20_000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Simulate the spawn manager on synthetic guilds and report its cost and spawn intervals.
+
+Messages are generated for guilds of the given sizes, each with a few chatters posting at
+random times, then fed in order to the real `SpawnManager.handle_message`. Time is virtual:
+the message timestamps and the clock of the spawn heuristics follow the simulation, so hours
+of chat run in seconds. Spawns are recorded instead of being sent. The results are printed as
+JSON, durations are in seconds unless stated otherwise.
+
+    python -m benchmarks.spawn [--guilds 200] [--sizes 50,300,2000] [--chatters 8]
+        [--rate 4] [--hours 6] [--message-range 22,55] [--cooldown 600] [--output file]
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from carfigures.core.utils.guildconfigs import GuildConfigCache
+from carfigures.packages.carfigures import spawn
+from carfigures.packages.carfigures.spawn import SpawnManager
+from carfigures.settings import settings
+
+WORDS = ["hello", "car", "lol", "nice", "spawn", "when", "gg", "fast", "vroom", "ok"]
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordedSpawns:
+    """
+    Stands for the spawn queue, keeping the virtual time of each spawn per guild.
+    """
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.times: dict[int, list[float]] = {}
+
+    def submit(self, guild: SimpleNamespace, channel_id: int) -> bool:
+        self.times.setdefault(guild.id, []).append(self.clock.now)
+        return True
+
+
+def generate_messages(
+    guilds: int, sizes: list[int], chatters: int, rate: float, hours: float, seed: int = 0
+) -> list[tuple[float, SimpleNamespace]]:
+    """
+    Messages of all the guilds sorted by time. Each chatter posts at exponentially distributed
+    intervals so that a guild receives `rate` messages per minute on average.
+    """
+    rng = random.Random(seed)
+    duration = hours * 3600
+    created_at = START - timedelta(days=365)
+    heap = []
+    for guild_id in range(guilds):
+        guild = SimpleNamespace(
+            id=guild_id, name=f"guild {guild_id}", member_count=sizes[guild_id % len(sizes)]
+        )
+        users = [
+            SimpleNamespace(id=guild_id * 1000 + i, created_at=created_at, bot=False)
+            for i in range(chatters)
+        ]
+        heap.append((rng.expovariate(rate / 60), guild_id, guild, users))
+
+    messages: list[tuple[float, SimpleNamespace]] = []
+    heapq.heapify(heap)
+    while heap:
+        now, _, guild, users = heapq.heappop(heap)
+        if now > duration:
+            continue
+        content = " ".join(rng.choices(WORDS, k=rng.randint(1, 6)))
+        message = SimpleNamespace(
+            content=content,
+            author=rng.choice(users),
+            guild=guild,
+            created_at=START + timedelta(seconds=now),
+        )
+        messages.append((now, message))
+        heapq.heappush(heap, (now + rng.expovariate(rate / 60), guild.id, guild, users))
+    return messages
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        return {}
+    cuts = statistics.quantiles(values, n=100)
+    return {
+        "p5": round(cuts[4], 1),
+        "p50": round(cuts[49], 1),
+        "p95": round(cuts[94], 1),
+        "min": round(min(values), 1),
+        "max": round(max(values), 1),
+    }
+
+
+def simulate(messages: list[tuple[float, SimpleNamespace]], guilds: int) -> dict:
+    clock = VirtualClock()
+    spawn.clock = clock
+    manager = SpawnManager(GuildConfigCache())
+    spawns = RecordedSpawns(clock)
+    manager.queue = spawns  # type: ignore
+    for guild_id in range(guilds):
+        manager.cache[guild_id] = guild_id
+
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for now, message in messages:
+        clock.now = now
+        manager.handle_message(message)  # type: ignore
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+
+    cooldowns = manager.cooldowns.values()
+    intervals = [
+        later - earlier
+        for times in spawns.times.values()
+        for earlier, later in zip(times, times[1:])
+    ]
+    total_spawns = sum(len(times) for times in spawns.times.values())
+    hours = messages[-1][0] / 3600 if messages else 0
+    return {
+        "messages": len(messages),
+        "messages_per_second": round(len(messages) / wall),
+        "cpu_per_message_us": round(cpu / len(messages) * 1e6, 2),
+        "bytes_per_guild": round(sum(x.memory_size() for x in cooldowns) / len(cooldowns)),
+        "spawns": total_spawns,
+        "spawns_per_guild_hour": round(total_spawns / guilds / hours, 2) if hours else 0,
+        "spawn_interval_minutes": percentiles([x / 60 for x in intervals]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--guilds", type=int, default=200)
+    parser.add_argument("--sizes", default="50,300,2000", help="member counts, cycled")
+    parser.add_argument("--chatters", type=int, default=8, help="active authors per guild")
+    parser.add_argument("--rate", type=float, default=4, help="messages per minute per guild")
+    parser.add_argument("--hours", type=float, default=6, help="simulated duration")
+    parser.add_argument("--message-range", default="22,55", help="requiredMessageRange")
+    parser.add_argument("--cooldown", type=int, default=600, help="cooldownTime in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the results there instead")
+    args = parser.parse_args()
+
+    logging.getLogger("carfigures").setLevel(logging.ERROR)  # farm warnings of small guilds
+    settings.required_message_range = [int(x) for x in args.message_range.split(",")]
+    settings.cooldown_time = args.cooldown
+    settings.minimum_members_required = 20
+    sizes = [int(x) for x in args.sizes.split(",")]
+    random.seed(args.seed)
+
+    messages = generate_messages(
+        args.guilds, sizes, args.chatters, args.rate, args.hours, args.seed
+    )
+    results = {
+        "guilds": args.guilds,
+        "sizes": sizes,
+        "chatters": args.chatters,
+        "rate": args.rate,
+        "hours": args.hours,
+        "required_message_range": settings.required_message_range,
+        "cooldown_time": settings.cooldown_time,
+        **simulate(messages, args.guilds),
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Measure the per-message cost of the spawn heuristics on a full message window.
+
+Compares the scan of the whole window done before with the incremental counters of
+`SpawnCooldown`, on a synthetic chat of a few authors repeating some messages, then the memory
+held by a full window of message texts with the hashed `MessageWindow`.
+
+    python -m benchmarks.spawn_window [--messages 100000] [--authors 12]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import deque, namedtuple
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from carfigures.packages.carfigures.spawn import MessageWindow, SpawnCooldown
+from carfigures.settings import settings
+
+WORDS = ["hello", "car", "lol", "nice", "spawn", "when", "gg", "fast", "vroom", "ok"]
+ScannedMessage = namedtuple("ScannedMessage", ["content", "author_id"])
+
+
+def generate_messages(count: int, authors: int) -> list[SimpleNamespace]:
+    rng = random.Random(0)
+    guild = SimpleNamespace(member_count=250)
+    created_at = datetime.now(timezone.utc) - timedelta(days=30)
+    users = [SimpleNamespace(id=i, created_at=created_at) for i in range(authors)]
+    return [
+        SimpleNamespace(
+            content=" ".join(rng.choices(WORDS, k=rng.randint(1, 6))),
+            author=rng.choice(users),
+            guild=guild,
+        )
+        for _ in range(count)
+    ]
+
+
+def scan(messages: list[SimpleNamespace]) -> float:
+    """
+    The heuristics as they were computed before, by scanning the window on every message.
+    """
+    message_cache: deque[ScannedMessage] = deque(maxlen=100)
+    unique_authors: set[int] = set()
+    total = 0.0
+    for message in messages:
+        message_cache.append(ScannedMessage(message.content, message.author.id))
+        message_multiplier = 1
+        if message.content.lower() in [m.content.lower() for m in message_cache]:
+            message_multiplier /= 2
+        if message.guild.member_count > 1000:
+            message_multiplier /= 2
+        if len(message.content) < 5:
+            message_multiplier /= 2
+        if (datetime.now(timezone.utc) - message.author.created_at).days < 7:
+            message_multiplier /= 2
+        if len(unique_authors) < 4 or (
+            len(list(filter(lambda x: x.author_id == message.author.id, message_cache)))
+            / message_cache.maxlen  # type: ignore
+            > 0.4
+        ):
+            message_multiplier /= 2
+        total += message_multiplier
+    return total
+
+
+def incremental(messages: list[SimpleNamespace]) -> float:
+    cooldown = SpawnCooldown(datetime.now(timezone.utc))
+    total = 0.0
+    for message in messages:
+        duplicate = cooldown.cache_message(message)  # type: ignore
+        total += cooldown.message_multiplier(message, duplicate)  # type: ignore
+    return total
+
+
+def window_sizes(messages: list[SimpleNamespace]) -> tuple[int, int]:
+    texts: deque[ScannedMessage] = deque(maxlen=100)
+    window = MessageWindow(100)
+    for message in messages:
+        texts.append(ScannedMessage(message.content, message.author.id))
+        window.append(message.content, message.author.id)
+    texts_size = sys.getsizeof(texts) + sum(
+        sys.getsizeof(m) + sys.getsizeof(m.content) + sys.getsizeof(m.author_id) for m in texts
+    )
+    return texts_size, window.memory_size()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--authors", type=int, default=12)
+    args = parser.parse_args()
+
+    settings.required_message_range = [22, 55]
+    messages = generate_messages(args.messages, args.authors)
+    for name, function in (("window scan", scan), ("incremental", incremental)):
+        start = time.perf_counter()
+        function(messages)
+        duration = time.perf_counter() - start
+        print(f"{name:<14}{duration / len(messages) * 1e6:>8.2f} µs/message")
+    texts_size, window_size = window_sizes(messages)
+    print(f"{'message texts':<14}{texts_size:>8} bytes/guild")
+    print(f"{'hashed window':<14}{window_size:>8} bytes/guild")
+
+
+if __name__ == "__main__":
+    main()
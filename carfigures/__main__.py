@@ -265,6 +265,9 @@ def main():
         )
         print("[yellow]Make sure to follow the configuration guide in the wiki.[/yellow]")
         sys.exit(1)
+    except ValueError as e:
+        print(f"[red]The config file is invalid: {e}[/red]")
+        sys.exit(1)
 
     print_welcome()
     queue_listener: logging.handlers.QueueListener | None = None
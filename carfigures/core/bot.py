@@ -8,6 +8,7 @@ import math
 import types
 from datetime import datetime
 import time
+from pathlib import Path
 from typing import TYPE_CHECKING, cast
 
 import aiohttp
@@ -21,7 +22,7 @@ from discord.app_commands.translator import (
     locale_str,
 )
 from discord.enums import Locale
-from discord.ext import commands
+from discord.ext import commands, tasks
 from prometheus_client import Histogram
 from rich import box, print
 from rich.console import Console
@@ -31,11 +32,23 @@ from carfigures.core.commands import Core
 from carfigures.core.dev import Dev
 from carfigures.core.metrics import PrometheusServer
 from carfigures.core import models
+from carfigures.core.utils import (
+    bannercache,
+    catchnames,
+    imagers,
+    rewards,
+    snapshot,
+    spawnassets,
+)
+from carfigures.core.utils.guildconfigs import GuildConfigCache
+from carfigures.core.utils.rendering import RenderPool
 from carfigures.settings import settings, appearance, information
 
 if TYPE_CHECKING:
     from discord.ext.commands.bot import PrefixType
 
+    from carfigures.packages.carfigures.cog import CarFiguresSpawner
+
 log = logging.getLogger("carfigures.core.bot")
 http_counter = Histogram("discord_http_requests", "HTTP requests", ["key", "code"])
 
@@ -155,6 +168,13 @@ class CarFiguresBot(commands.AutoShardedBot):
         self.blacklisted_servers: set[int] = set()
         self.locked_cars = TTLCache(maxsize=99999, ttl=60 * 30)
         self.application_emojis: dict[int, discord.Emoji] = {}
+        self.guild_configs = GuildConfigCache()
+        # only set while starting from a snapshot, until the packages are loaded
+        self.snapshot: snapshot.Snapshot | None = None
+        self.reconcile_task: asyncio.Task | None = None
+        self.render_pool = RenderPool(
+            settings.render_mode, settings.render_workers, settings.render_max_in_flight
+        )
 
         self.owner_ids: set
 
@@ -193,7 +213,20 @@ class CarFiguresBot(commands.AutoShardedBot):
                 )
     def get_emoji(self, id: int) -> discord.Emoji | None:
         return self.application_emojis.get(id) or super().get_emoji(id)
-    
+
+    def catalog_images(self) -> set[str]:
+        """
+        Paths of every image the cached catalog uses to draw cards and banners.
+        """
+        paths: set[str] = set()
+        paths.update(car.collectionPicture for car in models.cars.values())
+        paths.update(cartype.image for cartype in models.cartypes.values())
+        paths.update(country.image for country in models.countries.values())
+        paths.update(exclusive.image for exclusive in models.exclusives.values())
+        for event in models.events.values():
+            paths.update((event.card, event.banner))
+        return {"." + path for path in paths if path}
+
     async def reload_cache(self):
         table = Table(box=box.SIMPLE)
         table.add_column("Model", style="cyan")
@@ -203,49 +236,162 @@ class CarFiguresBot(commands.AutoShardedBot):
         for emoji in await self.fetch_application_emojis():
             self.application_emojis[emoji.id] = emoji
 
-        self.blacklisted_users = set()
-        for blacklisted_user in await models.BlacklistedUser.all().only("discord_id"):
-            self.blacklisted_users.add(blacklisted_user.discord_id)
+        previous_images = self.catalog_images()
+
+        # the caches are replaced at once once queried, so that they are never seen empty when
+        # reconciling a snapshot in the background
+        self.blacklisted_users = {
+            x.discord_id for x in await models.BlacklistedUser.all().only("discord_id")
+        }
         table.add_row("Blacklisted users", str(len(self.blacklisted_users)))
 
-        self.blacklisted_servers = set()
-        for blacklisted_server in await models.BlacklistedGuild.all().only("discord_id"):
-            self.blacklisted_servers.add(blacklisted_server.discord_id)
+        self.blacklisted_servers = {
+            x.discord_id for x in await models.BlacklistedGuild.all().only("discord_id")
+        }
         table.add_row("Blacklisted guilds", str(len(self.blacklisted_servers)))
 
+        cars = {car.pk: car for car in await models.Car.all()}
         models.cars.clear()
-        for car in await models.Car.all():
-            models.cars[car.pk] = car
+        models.cars.update(cars)
         table.add_row(appearance.collectible_plural.title(), str(len(models.cars)))
 
+        cartypes = {cartype.pk: cartype for cartype in await models.CarType.all()}
         models.cartypes.clear()
-        for cartype in await models.CarType.all():
-            models.cartypes[cartype.pk] = cartype
+        models.cartypes.update(cartypes)
         table.add_row(f"{appearance.album}s", str(len(models.cartypes)))
 
+        countries = {country.pk: country for country in await models.Country.all()}
         models.countries.clear()
-        for country in await models.Country.all():
-            models.countries[country.pk] = country
+        models.countries.update(countries)
         table.add_row(f"{appearance.country}s", str(len(models.countries)))
 
+        events = {event.pk: event for event in await models.Event.all()}
         models.events.clear()
-        for event in await models.Event.all():
-            models.events[event.pk] = event
+        models.events.update(events)
         table.add_row("Events", str(len(models.events)))
 
+        exclusives = {exclusive.pk: exclusive for exclusive in await models.Exclusive.all()}
         models.exclusives.clear()
-        for exclusive in await models.Exclusive.all():
-            models.exclusives[exclusive.pk] = exclusive
+        models.exclusives.update(exclusives)
         table.add_row(f"{appearance.exclusive}s", str(len(models.exclusives)))
 
+        fontspacks = {fontspack.pk: fontspack for fontspack in await models.FontsPack.all()}
         models.fontspacks.clear()
-        for fontspack in await models.FontsPack.all():
-            models.fontspacks[fontspack.pk] = fontspack
+        models.fontspacks.update(fontspacks)
         table.add_row("FontsPacks", str(len(models.fontspacks)))
+
+        await self.prepare_catalog(previous_images)
+        table.add_row("Spawn pictures", str(len(spawnassets.pictures.assets)))
         log.info("Cache loaded, summary displayed below")
         console = Console()
         console.print(table)
 
+    async def prepare_catalog(self, previous_images: set[str]):
+        """
+        Fill the caches derived from the catalog: spawn and reward samplers, catch names, spawn
+        pictures, render workers and event banners. `previous_images` are the images used before
+        the catalog changed, the ones not used anymore are dropped from the image cache.
+        """
+        spawnable = [car for car in models.cars.values() if car.enabled and car.rarity > 0]
+        models.spawnable_cars.rebuild(spawnable, [car.rarity for car in spawnable])
+        catchnames.index.rebuild(models.cars.values())
+        rewards.catch_rewards.rebuild(models.exclusives.values(), models.events.values())
+        await asyncio.to_thread(
+            spawnassets.pictures.load,
+            {"." + car.spawnPicture for car in models.cars.values() if car.enabled},
+        )
+        imagers.load_font.cache_clear()  # fonts files may have changed
+        imagers.images.discard(previous_images - self.catalog_images())
+        self.render_pool.start(
+            fonts={
+                "." + path
+                for fontspack in models.fontspacks.values()
+                for path in (
+                    fontspack.title,
+                    fontspack.capacityn,
+                    fontspack.capacityd,
+                    fontspack.stats,
+                    fontspack.credits,
+                )
+            },
+            backgrounds={"." + cartype.image for cartype in models.cartypes.values()}
+            | {"." + exclusive.image for exclusive in models.exclusives.values()}
+            | {"." + event.card for event in models.events.values() if event.card},
+        )
+        bannercache.banners.prewarm(
+            self.render_pool,
+            (event for event in models.events.values() if event.banner and not event.hidden),
+        )
+
+    async def restore_snapshot(self, state: snapshot.Snapshot):
+        """
+        Fill the caches from a snapshot instead of the database. Application emojis are not
+        part of it, they are fetched when reconciling.
+        """
+        previous_images = self.catalog_images()
+        self.blacklisted_users = set(state.blacklisted_users)
+        self.blacklisted_servers = set(state.blacklisted_servers)
+        for name, catalog in state.catalog.items():
+            cache = getattr(models, name)
+            cache.clear()
+            cache.update(catalog)
+        self.guild_configs.restore(state.guild_configs)
+        await self.prepare_catalog(previous_images)
+        log.info(
+            f"Cache restored from the snapshot of {state.created_at:%Y-%m-%d %H:%M:%S} UTC, "
+            "reconciling with the database in the background"
+        )
+
+    async def reconcile_snapshot(self):
+        """
+        Reload the caches restored from a snapshot with the content of the database.
+        """
+        try:
+            await self.reload_cache()
+            if spawner := cast("CarFiguresSpawner | None", self.get_cog("CarFiguresSpawner")):
+                await spawner.load_cache()
+        except Exception:
+            log.exception("Failed to reconcile the snapshot with the database")
+
+    def take_snapshot(self) -> snapshot.Snapshot:
+        configs = [x for x in self.guild_configs.configs.values() if x is not None]
+        state = snapshot.Snapshot(
+            catalog={name: dict(getattr(models, name)) for name in snapshot.CATALOGS},
+            blacklisted_users=set(self.blacklisted_users),
+            blacklisted_servers=set(self.blacklisted_servers),
+            guild_configs=configs,
+        )
+        if spawner := cast("CarFiguresSpawner | None", self.get_cog("CarFiguresSpawner")):
+            state.spawn_channels = dict(spawner.spawn_manager.cache)
+            state.cooldowns = spawner.spawn_manager.dump_cooldowns()
+        return state
+
+    async def save_snapshot(self):
+        assert settings.snapshot_path
+        data = snapshot.encode(self.take_snapshot())
+        await asyncio.to_thread(snapshot.write, Path(settings.snapshot_path), data)
+        log.debug(f"Snapshot of {len(data)} bytes written")
+
+    @tasks.loop(minutes=5)
+    async def snapshot_loop(self):
+        try:
+            await self.save_snapshot()
+        except Exception:
+            log.exception("Failed to write the snapshot")
+
+    async def close(self):
+        if self.snapshot_loop.is_running():
+            self.snapshot_loop.cancel()
+            try:
+                await self.save_snapshot()
+            except Exception:
+                log.exception("Failed to write the snapshot")
+        if self.reconcile_task:
+            self.reconcile_task.cancel()
+        bannercache.banners.cancel()
+        self.render_pool.shutdown()
+        await super().close()
+
     async def gateway_healthy(self) -> bool:
         """Check whether or not the gateway proxy is ready and healthy."""
         if settings.gatewayUrl is None:
@@ -295,7 +441,12 @@ class CarFiguresBot(commands.AutoShardedBot):
                 f"{await self.fetch_user(next(iter(self.owner_ids)))} is the owner of this bot."
             )
 
-        await self.reload_cache()
+        if settings.snapshot_path:
+            self.snapshot = await asyncio.to_thread(snapshot.read, Path(settings.snapshot_path))
+        if self.snapshot:
+            await self.restore_snapshot(self.snapshot)
+        else:
+            await self.reload_cache()
         if self.blacklisted_users:
             log.info(f"{len(self.blacklisted_users)} blacklisted users.")
 
@@ -317,6 +468,13 @@ class CarFiguresBot(commands.AutoShardedBot):
         else:
             log.info("No package loaded.")
 
+        if self.snapshot:
+            self.snapshot = None
+            self.reconcile_task = asyncio.create_task(self.reconcile_snapshot())
+        if settings.snapshot_path:
+            self.snapshot_loop.change_interval(seconds=settings.snapshot_interval)
+            self.snapshot_loop.start()
+
         synced_commands = await self.tree.sync()
         if synced_commands:
             log.info(f"Synced {len(synced_commands)} commands.")
@@ -10,7 +10,9 @@ from tortoise.exceptions import DoesNotExist
 
 from carfigures.packages.carfigures.carfigure import CarFigure
 from carfigures.core.dev import pagify, send_interactive
+from carfigures.core import models
 from carfigures.core.models import Car, CarInstance, Player
+from carfigures.core.utils import catchnames
 from carfigures.settings import appearance
 
 log = logging.getLogger("carfigures.core.commands")
@@ -118,17 +120,20 @@ class Core(commands.Cog):
         """
         Spawn an entity.
         """
-        for _ in range(amount):
-            if not car:
-                carfigure = await CarFigure.getRandom()
-            else:
-                try:
-                    car_model = await Car.get(fullName__iexact=car.lower())
-                except DoesNotExist:
-                    await ctx.send(f"No such {appearance.collectible_singular} exists.")
-                    return
-                carfigure = CarFigure(car_model)
-            await carfigure.spawn(channel or ctx.channel)
+        if not car:
+            carfigures = await CarFigure.get_random_many(amount)
+        else:
+            pk = catchnames.index.find(car)
+            if pk is None or pk not in models.cars:
+                await ctx.send(f"No such {appearance.collectible_singular} exists.")
+                return
+            car_model = models.cars[pk]
+            carfigures = [CarFigure(car_model) for _ in range(amount)]
+        channel = channel or ctx.channel  # type: ignore
+        assert channel.guild
+        config = await self.bot.guild_configs.get(channel.guild.id)
+        for carfigure in carfigures:
+            await carfigure.spawn(channel, config)
 
     @commands.command()
     @commands.is_owner()
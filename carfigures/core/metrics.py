@@ -3,13 +3,16 @@ import logging
 import math
 from collections import defaultdict
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
 from aiohttp import web
 from prometheus_client import CONTENT_TYPE_LATEST, Gauge, Histogram, generate_latest, Counter
 
+from carfigures.core.utils import imagers, spawnassets
+
 if TYPE_CHECKING:
     from carfigures.core.bot import CarFiguresBot
+    from carfigures.packages.carfigures.cog import CarFiguresSpawner
 
 log = logging.getLogger("carfigures.core.metrics")
 
@@ -18,6 +21,13 @@ caught_cars = Counter(
     "Caught carfigures",
     ["fullName", "exclusive", "event", "guild_size"],
 )
+spawn_queue_depth = Gauge("spawn_queue", "Spawns waiting for a free spawn worker")
+spawn_queue_wait = Histogram(
+    "spawn_queue_wait", "Time spent by spawns in queue before being processed"
+)
+spawn_queue_dropped = Counter(
+    "spawn_queue_dropped", "Spawns dropped instead of being queued", ["reason"]
+)
 
 
 class PrometheusServer:
@@ -38,6 +48,19 @@ class PrometheusServer:
         self.app.add_routes((web.get("/metrics", self.get),))
 
         self.guild_count = Gauge("guilds", "Number of guilds the server is in", ["size"])
+        self.font_cache = Gauge(
+            "font_cache", "Font cache lookups since the last cache reload", ["result"]
+        )
+        self.image_cache_size = Gauge(
+            "image_cache_bytes", "Memory held by the decoded card images"
+        )
+        self.spawn_assets_size = Gauge("spawn_assets_bytes", "Memory held by the spawn pictures")
+        self.spawn_cooldowns = Gauge(
+            "spawn_cooldowns", "Guilds whose spawn progress is kept in memory"
+        )
+        self.spawn_cooldowns_size = Gauge(
+            "spawn_cooldowns_bytes", "Estimated memory held by the spawn progress of the guilds"
+        )
         self.shards_latecy = Histogram("gateway_latency", "Shard latency with the Discord gateway", ["shard_id"])
         self.asyncio_delay = Histogram(
             "asyncio_delay",
@@ -76,6 +99,17 @@ class PrometheusServer:
         for shard_id, latency in self.bot.latencies:
             self.shards_latecy.labels(shard_id=shard_id).observe(latency)
 
+        font_cache_info = imagers.load_font.cache_info()
+        self.font_cache.labels(result="hit").set(font_cache_info.hits)
+        self.font_cache.labels(result="miss").set(font_cache_info.misses)
+        self.image_cache_size.set(imagers.images.currsize)
+        self.spawn_assets_size.set(spawnassets.pictures.size)
+
+        if spawner := cast("CarFiguresSpawner | None", self.bot.get_cog("CarFiguresSpawner")):
+            cooldowns = spawner.spawn_manager.cooldowns
+            self.spawn_cooldowns.set(len(cooldowns))
+            self.spawn_cooldowns_size.set(sum(x.memory_size() for x in cooldowns.values()))
+
         t1 = datetime.now()
         await asyncio.sleep(1)
         t2 = datetime.now()
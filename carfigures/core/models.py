@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from io import BytesIO
 from typing import TYPE_CHECKING, Iterable, Tuple, Type
@@ -8,15 +7,18 @@ from enum import IntEnum
 
 import discord
 from discord.utils import format_dt
-from tortoise import exceptions, fields, models, signals, timezone, validators
+from tortoise import Tortoise, exceptions, fields, models, signals, timezone, validators
 from tortoise.expressions import Q
 from fastapi_admin.models import AbstractAdmin
-from carfigures.core.utils import imagers
-from carfigures.settings import appearance
+from carfigures.core.utils import bannercache, cardcache, imagers
+from carfigures.core.utils.sampling import AliasSampler
+from carfigures.settings import appearance, settings
 
 if TYPE_CHECKING:
     from tortoise.backends.base.client import BaseDBAsyncClient
 
+    from carfigures.core.bot import CarFiguresBot
+
 
 cars: dict[int, Car] = {}
 cartypes: dict[int, CarType] = {}
@@ -24,6 +26,8 @@ countries: dict[int, Country] = {}
 exclusives: dict[int, Exclusive] = {}
 events: dict[int, Event] = {}
 fontspacks: dict[int, FontsPack] = {}
+# enabled cars weighted by rarity, rebuilt with the caches above
+spawnable_cars: AliasSampler[Car] = AliasSampler()
 
 
 async def lower_catch_names(
@@ -191,23 +195,17 @@ class Event(models.Model):
         ordering = ["-startDate"]
 
     def draw_banner(self) -> BytesIO:
-        image = imagers.draw_banner(self)
-        buffer = BytesIO()
-        image.save(buffer, format="png")
-        buffer.seek(0)
-        image.close()
-        return buffer
+        return imagers.banner_buffer(imagers.BannerTemplate.from_event(self))
 
     async def prepare_for_message(
-        self, interaction: discord.Interaction
+        self, interaction: discord.Interaction["CarFiguresBot"]
     ) -> Tuple[str, discord.File]:
         # message content
         content = f"**Event Info:**\n**Event:** {self.name}\n**Description:** {self.description}"
         # draw image
-        with ThreadPoolExecutor() as pool:
-            buffer = await interaction.client.loop.run_in_executor(pool, self.draw_banner)
+        buffer = await bannercache.banners.get(interaction.client.render_pool, self)
 
-        return content, discord.File(buffer, "banner.png")
+        return content, discord.File(buffer, f"banner.{imagers.Encoder.from_settings().extension}")
 
 
 class Car(models.Model):
@@ -221,6 +219,10 @@ class Car(models.Model):
         default=None,
         description="Additional possible names for catching this car, separated by semicolons",
     )
+    catchTolerance = fields.IntField(
+        default=0,
+        description="Number of typos allowed in the name when catching this car",
+    )
     cartype: fields.ForeignKeyRelation[CarType] = fields.ForeignKeyField(
         "models.CarType",
         description="The CarType of this Car",
@@ -326,10 +328,86 @@ class CarInstance(models.Model):
         default=None,
     )
     extra_data = fields.JSONField(default={})
+    spawnToken = fields.UUIDField(
+        description="Token of the spawn this car was caught from, only one catch per spawn",
+        null=True,
+        unique=True,
+        default=None,
+    )
 
     class Meta:
         unique_together = ("player", "id")
 
+    @classmethod
+    async def catch(cls, discord_id: int, **kwargs) -> tuple[CarInstance, bool] | None:
+        """
+        Create an instance owned by the player with the given Discord ID, creating the player
+        if needed, in a single statement.
+
+        If a `spawnToken` is given and an instance was already created with it, nothing is
+        created and `None` is returned, so that a spawn can't be caught twice even by several
+        processes.
+
+        Parameters
+        ----------
+        discord_id: int
+            Discord ID of the player catching the car.
+        **kwargs
+            Fields of the new instance, except `player`.
+
+        Returns
+        -------
+        tuple[CarInstance, bool] | None
+            The created instance, and whether it's the first instance of this car owned by the
+            player. `None` if the spawn token was already used.
+        """
+        instance = cls(**kwargs)
+        player = Player(discord_id=discord_id)
+
+        def insert(model: models.Model, exclude: set[str]) -> tuple[list[str], list]:
+            meta = model._meta
+            names = sorted(meta.db_fields - exclude)
+            values = [
+                meta.fields_map[name].to_db_value(getattr(model, name), model) for name in names
+            ]
+            return [f'"{meta.fields_db_projection[name]}"' for name in names], values
+
+        player_columns, player_values = insert(player, {"id"})
+        columns, values = insert(instance, {"id", "player_id"})
+        placeholders = [f"${i}" for i in range(1, len(player_values) + len(values) + 1)]
+        player_parameters = placeholders[: len(player_values)]
+        parameters = placeholders[len(player_values) :]
+
+        # the no-op update makes the existing player row returned on conflict. The final select
+        # runs on the snapshot taken before the insert, it doesn't see the new instance
+        query = f"""
+            WITH player AS (
+                INSERT INTO "{Player._meta.db_table}" ({", ".join(player_columns)})
+                VALUES ({", ".join(player_parameters)})
+                ON CONFLICT ("discord_id") DO UPDATE SET "discord_id" = EXCLUDED."discord_id"
+                RETURNING "id"
+            ), instance AS (
+                INSERT INTO "{cls._meta.db_table}" ("player_id", {", ".join(columns)})
+                SELECT player."id", {", ".join(parameters)} FROM player
+                ON CONFLICT ("spawnToken") DO NOTHING
+                RETURNING "id", "player_id", "car_id"
+            )
+            SELECT instance."id", instance."player_id", NOT EXISTS (
+                SELECT 1 FROM "{cls._meta.db_table}" AS previous
+                WHERE previous."player_id" = instance."player_id"
+                AND previous."car_id" = instance."car_id"
+            ) AS "is_new"
+            FROM instance
+        """
+        connection = Tortoise.get_connection("default")
+        rows = await connection.execute_query_dict(query, player_values + values)
+        if not rows:
+            return None
+        instance.id = rows[0]["id"]
+        instance.player_id = rows[0]["player_id"]
+        instance._saved_in_db = True
+        return instance, rows[0]["is_new"]
+
     @property
     def is_tradeable(self) -> bool:
         return (
@@ -434,16 +512,29 @@ class CarInstance(models.Model):
                     text = f"{emoji} {text}"
         return text
 
-    def draw_card(self) -> BytesIO:
-        image = imagers.draw_card(self)
-        buffer = BytesIO()
-        image.save(buffer, format="png")
-        buffer.seek(0)
-        image.close()
-        return buffer
+    def draw_card(self, tier: str = "full") -> BytesIO:
+        return imagers.card_buffer(
+            imagers.CardTemplate.from_instance(self),
+            self.weight,
+            self.horsepower,
+            imagers.tier_scale(tier),
+        )
+
+    async def card_file(self, bot: "CarFiguresBot", tier: str | None = None) -> discord.File:
+        """
+        Render the card on the bot's render pool, in the given tier or the configured one.
+        """
+        buffer = await bot.render_pool.run(
+            cardcache.card_buffer,
+            imagers.CardTemplate.from_instance(self),
+            self.weight,
+            self.horsepower,
+            imagers.tier_scale(tier or settings.card_tier),
+        )
+        return discord.File(buffer, f"card.{imagers.Encoder.from_settings().extension}")
 
     async def prepare_for_message(
-        self, interaction: discord.Interaction
+        self, interaction: discord.Interaction["CarFiguresBot"], tier: str | None = None
     ) -> Tuple[str, discord.File]:
         # message content
         trade_content = ""
@@ -482,10 +573,7 @@ class CarInstance(models.Model):
         )
 
         # draw image
-        with ThreadPoolExecutor() as pool:
-            buffer = await interaction.client.loop.run_in_executor(pool, self.draw_card)
-
-        return content, discord.File(buffer, "card.png")
+        return content, await self.card_file(interaction.client, tier)
 
     async def lock_for_trade(self):
         self.locked = timezone.now()
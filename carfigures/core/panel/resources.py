@@ -296,6 +296,7 @@ class EntityResource(Model):
             input_=inputs.Text(),
         ),
         "catchNames",
+        "catchTolerance",
         "createdAt",
         "cartype",
         "country",
@@ -1,4 +1,4 @@
-from fastapi import Depends, Path
+from fastapi import Depends, Path, Query
 from fastapi_admin.app import app
 from fastapi_admin.depends import get_current_admin, get_resources
 from fastapi_admin.template import templates
@@ -7,6 +7,7 @@ from starlette.responses import RedirectResponse, Response
 from tortoise.exceptions import DoesNotExist
 
 from carfigures.core import models
+from carfigures.core.utils import imagers
 
 
 @app.get("/")
@@ -42,17 +43,19 @@ async def home(
 async def generate_card(
     request: Request,
     pk: str = Path(...),
+    tier: str = Query("full", pattern="^(full|preview)$"),
 ):
     car = await models.Car.get(pk=pk).prefetch_related("cartype", "cartype__fontsPack", "country")
     tempInstance = await models.CarInstance(car=car, player=await models.Player.first(), count=1)
-    buffer = tempInstance.draw_card()
-    return Response(content=buffer.read(), media_type="image/png")
+    buffer = tempInstance.draw_card(tier)
+    return Response(content=buffer.read(), media_type=imagers.Encoder.from_settings().media_type)
 
 
 @app.get("/event/generate/{pk}", dependencies=[Depends(get_current_admin)])
 async def generate_event_card(
     request: Request,
     pk: str = Path(...),
+    tier: str = Query("full", pattern="^(full|preview)$"),
 ):
     event = await models.Event.get(pk=pk)
     try:
@@ -64,14 +67,15 @@ async def generate_event_card(
     instance = models.CarInstance(
         car=car, event=event, player=await models.Player.first(), count=1
     )
-    buffer = instance.draw_card()
-    return Response(content=buffer.read(), media_type="image/png")
+    buffer = instance.draw_card(tier)
+    return Response(content=buffer.read(), media_type=imagers.Encoder.from_settings().media_type)
 
 
 @app.get("/exclusive/generate/{pk}", dependencies=[Depends(get_current_admin)])
 async def generate_exclusive_card(
     request: Request,
     pk: str = Path(...),
+    tier: str = Query("full", pattern="^(full|preview)$"),
 ):
     exclusive = await models.Exclusive.get(pk=pk)
     try:
@@ -83,5 +87,5 @@ async def generate_exclusive_card(
     instance = models.CarInstance(
         car=car, exclusive=exclusive, player=await models.Player.first(), count=1
     )
-    buffer = instance.draw_card()
-    return Response(content=buffer.read(), media_type="image/png")
+    buffer = instance.draw_card(tier)
+    return Response(content=buffer.read(), media_type=imagers.Encoder.from_settings().media_type)
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import TYPE_CHECKING, Hashable, Iterable
+
+from carfigures.core.utils import imagers
+from carfigures.core.utils.rendering import RenderPool
+
+if TYPE_CHECKING:
+    from carfigures.core.models import Event
+
+log = logging.getLogger("carfigures.core.utils.bannercache")
+
+
+class BannerCache:
+    """
+    Encoded event banners, kept in memory with one banner per event.
+
+    A banner is served again as long as the event's texts, fonts and banner files are the
+    same and the event is still on the same side of its end date. `prewarm` renders the
+    banners of the visible events ahead of time, and renders them again when they end.
+    """
+
+    def __init__(self):
+        self.banners: dict[int, tuple[Hashable, bytes]] = {}
+        self.tasks: dict[int, asyncio.Task] = {}
+
+    @staticmethod
+    def key(template: imagers.BannerTemplate) -> Hashable:
+        files = (
+            template.banner,
+            template.title_font,
+            template.description_font,
+            template.status_font,
+            template.credits_font,
+        )
+        stamps = tuple(os.stat(file).st_mtime_ns for file in files)
+        return (template, stamps, imagers.Encoder.from_settings())
+
+    async def get(self, pool: RenderPool, event: "Event") -> BytesIO:
+        """
+        Return the banner of the event, rendering it on the pool if needed.
+        """
+        template = imagers.BannerTemplate.from_event(event)
+        key = self.key(template)
+        cached = self.banners.get(event.pk)
+        if cached and cached[0] == key:
+            return BytesIO(cached[1])
+        buffer = await pool.run(imagers.banner_buffer, template)
+        self.banners[event.pk] = (key, buffer.getvalue())
+        return buffer
+
+    async def _refresh(self, pool: RenderPool, event: "Event"):
+        try:
+            await self.get(pool, event)
+            delay = (event.endDate - datetime.now(timezone.utc)).total_seconds()
+            if delay < 0:
+                return
+            await asyncio.sleep(delay + 1)
+            await self.get(pool, event)  # now ended
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.error(f"Failed to render the banner of event {event.pk}", exc_info=True)
+
+    def prewarm(self, pool: RenderPool, events: Iterable["Event"]):
+        """
+        Render the banners of the given events in the background, and again when each of
+        them ends. Replaces the tasks of the previous call and forgets the other events.
+        """
+        self.cancel()
+        visible = {event.pk: event for event in events}
+        for pk in self.banners.keys() - visible.keys():
+            del self.banners[pk]
+        for pk, event in visible.items():
+            self.tasks[pk] = asyncio.create_task(self._refresh(pool, event), name=f"banner-{pk}")
+
+    def cancel(self):
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks.clear()
+
+
+banners = BannerCache()
@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import astuple
+from io import BytesIO
+from pathlib import Path
+
+from carfigures.core.utils import imagers
+from carfigures.settings import settings
+
+log = logging.getLogger("carfigures.core.utils.cardcache")
+
+# bump this when the drawing code changes, to stop serving cards rendered the old way
+RENDER_VERSION = 1
+
+
+class CardCache:
+    """
+    Size-capped directory of encoded cards, each file named after the hash of everything
+    that determines its pixels: the template's texts and assets, the stats, and the size and
+    modification time of every file used. Editing the catalog or replacing an asset changes
+    the hash, so stale cards are never served and age out on their own.
+
+    Files are touched when served, and the least recently used ones are removed when the
+    directory grows past its size. The directory can be shared by several processes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.written = 0
+
+    @property
+    def path(self) -> Path:
+        return Path(settings.card_cache_path)
+
+    @property
+    def maxsize(self) -> int:
+        return settings.card_cache_size * 1024**2
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def key(
+        self, template: imagers.CardTemplate, weight: int, horsepower: int, scale: float = 1.0
+    ) -> str:
+        files = [
+            template.background,
+            template.artwork,
+            template.title_font,
+            template.capacity_name_font,
+            template.capacity_description_font,
+            template.stats_font,
+            template.credits_font,
+        ]
+        if template.icon:
+            files.append(template.icon)
+        stamps = []
+        for file in files:
+            stat = os.stat(file)
+            stamps.append((stat.st_size, stat.st_mtime_ns))
+        encoder = imagers.Encoder.from_settings()
+        content = (
+            RENDER_VERSION,
+            astuple(template),
+            weight,
+            horsepower,
+            scale,
+            astuple(encoder),
+            stamps,
+        )
+        return f"{hashlib.sha256(repr(content).encode()).hexdigest()}.{encoder.extension}"
+
+    def get(self, key: str) -> bytes | None:
+        file = self.path / key
+        try:
+            data = file.read_bytes()
+            os.utime(file)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes):
+        self.path.mkdir(parents=True, exist_ok=True)
+        file = self.path / key
+        # write then rename, readers must never see a partial file
+        temp = file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        temp.write_bytes(data)
+        os.replace(temp, file)
+
+        with self.lock:
+            self.written += len(data)
+            if self.written < self.maxsize // 10:
+                return
+            self.written = 0
+        self.prune()
+
+    def prune(self):
+        """
+        Remove the least recently used cards until the directory fits in its size.
+        """
+        entries: list[tuple[int, int, str]] = []
+        with os.scandir(self.path) as iterator:
+            for entry in iterator:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # removed by another process
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.maxsize:
+            return
+        entries.sort()
+        removed = 0
+        for _, size, file in entries:
+            if total <= self.maxsize:
+                break
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        log.debug(f"Removed {removed} cards from the cache")
+
+
+cards = CardCache()
+
+
+def card_buffer(
+    template: imagers.CardTemplate, weight: int, horsepower: int, scale: float = 1.0
+) -> BytesIO:
+    """
+    Same as `imagers.card_buffer`, but serves the card from the disk cache when it was
+    already rendered.
+    """
+    if not cards.enabled:
+        return imagers.card_buffer(template, weight, horsepower, scale)
+
+    key = cards.key(template, weight, horsepower, scale)
+    if (data := cards.get(key)) is not None:
+        return BytesIO(data)
+    buffer = imagers.card_buffer(template, weight, horsepower, scale)
+    try:
+        cards.put(key, buffer.getvalue())
+    except OSError:
+        log.warning("Failed to write a card to the cache", exc_info=True)
+    return buffer
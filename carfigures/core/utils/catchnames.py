@@ -0,0 +1,114 @@
+import logging
+import unicodedata
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from carfigures.core.models import Car
+
+log = logging.getLogger("carfigures.core.utils.catchnames")
+
+
+def normalize(name: str) -> str:
+    """
+    Reduce a name to what matters when comparing it to a guess: accents, case, whitespace and
+    punctuation are dropped, "Citroën C-4 " becomes "citroenc4".
+    """
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    return "".join(char for char in decomposed if char.isalnum())
+
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between `a` and `b`, or `limit + 1` as soon as it's known to be
+    greater than `limit`. Costs O(len(a) * limit) instead of O(len(a) * len(b)).
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        # only the cells within `limit` of the diagonal can stay under the limit
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [limit + 1] * (len(b) + 1)
+        if low == 1:
+            current[0] = i
+        for j in range(low, high + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != b[j - 1]),
+            )
+        if min(current[low - 1 : high + 1]) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[len(b)], limit + 1)
+
+
+class CatchNameIndex:
+    """
+    Normalized names of the cars, their full name and catch names, built when the cache is
+    reloaded.
+
+    Exact matches are dictionary lookups. A car with a `catchTolerance` above 0 also accepts
+    names within that many edited characters of one of its names.
+    """
+
+    def __init__(self):
+        self.names: dict[str, int] = {}
+        self.car_names: dict[int, frozenset[str]] = {}
+        self.tolerances: dict[int, int] = {}
+
+    @staticmethod
+    def names_of(car: "Car") -> frozenset[str]:
+        names = [car.fullName, *(car.catchNames or "").split(";")]
+        return frozenset(normalized for name in names if (normalized := normalize(name)))
+
+    def rebuild(self, cars: Iterable["Car"]):
+        names: dict[str, int] = {}
+        car_names: dict[int, frozenset[str]] = {}
+        tolerances: dict[int, int] = {}
+        for car in cars:
+            car_names[car.pk] = self.names_of(car)
+            tolerances[car.pk] = car.catchTolerance
+            for name in car_names[car.pk]:
+                if names.setdefault(name, car.pk) != car.pk:
+                    log.warning(f'Cars {names[name]} and {car.pk} share the name "{name}"')
+        self.names, self.car_names, self.tolerances = names, car_names, tolerances
+
+    def matches(self, guess: str, car: "Car") -> bool:
+        """
+        Whether the guess is one of the names of the car, within its tolerance.
+        """
+        guess = normalize(guess)
+        if not guess:
+            return False
+        # cars edited since the last reload aren't indexed yet
+        names = self.car_names.get(car.pk) or self.names_of(car)
+        if guess in names:
+            return True
+        tolerance = car.catchTolerance
+        return any(bounded_distance(guess, name, tolerance) <= tolerance for name in names)
+
+    def find(self, guess: str) -> int | None:
+        """
+        Return the pk of the car with this name, or with the closest name within its
+        tolerance.
+        """
+        guess = normalize(guess)
+        if not guess:
+            return None
+        if (pk := self.names.get(guess)) is not None:
+            return pk
+        best: tuple[int, int] | None = None
+        for name, pk in self.names.items():
+            tolerance = self.tolerances[pk]
+            if not tolerance:
+                continue
+            distance = bounded_distance(guess, name, tolerance)
+            if distance <= tolerance and (best is None or distance < best[0]):
+                best = (distance, pk)
+        return best[1] if best else None
+
+
+index = CatchNameIndex()
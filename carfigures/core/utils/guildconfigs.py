@@ -0,0 +1,71 @@
+import logging
+from typing import Iterable
+
+from carfigures.core.models import GuildConfig
+
+log = logging.getLogger("carfigures.core.utils.guildconfigs")
+
+
+class GuildConfigCache:
+    """
+    Write-through cache of the `GuildConfig` rows, owned by the bot.
+
+    The guilds where spawn is enabled are loaded at startup, the others are fetched on first
+    use, several at once with `get_many`. Guilds without a config are remembered as `None`.
+    Changes must be saved with `save` so that the cache stays in sync with the database, then
+    announced with the `carfigures_settings_change` event for the listeners keeping their own
+    state, like the spawn manager.
+    """
+
+    def __init__(self):
+        self.configs: dict[int, GuildConfig | None] = {}
+
+    async def load(self) -> list[GuildConfig]:
+        """
+        Reset the cache with the configs of the guilds where spawn is enabled in a channel, and
+        return them.
+        """
+        configs = await GuildConfig.filter(enabled=True, spawnChannel__isnull=False)
+        self.configs = {config.guild_id: config for config in configs}
+        return configs
+
+    def restore(self, configs: Iterable[GuildConfig]):
+        """
+        Reset the cache with configs kept from a previous run, until `load` is called again.
+        """
+        self.configs = {config.guild_id: config for config in configs}
+
+    def get_cached(self, guild_id: int) -> GuildConfig | None:
+        """
+        Return the config of the guild if it's cached, without querying the database.
+        """
+        return self.configs.get(guild_id)
+
+    async def get(self, guild_id: int) -> GuildConfig | None:
+        if guild_id in self.configs:
+            return self.configs[guild_id]
+        return (await self.get_many((guild_id,)))[guild_id]
+
+    async def get_many(self, guild_ids: Iterable[int]) -> dict[int, GuildConfig | None]:
+        """
+        Return the configs of the given guilds, fetching the missing ones in a single query.
+        """
+        guild_ids = set(guild_ids)
+        missing = guild_ids - self.configs.keys()
+        if missing:
+            for config in await GuildConfig.filter(guild_id__in=missing):
+                self.configs[config.guild_id] = config
+            for guild_id in missing:
+                self.configs.setdefault(guild_id, None)
+        return {guild_id: self.configs[guild_id] for guild_id in guild_ids}
+
+    async def get_or_create(self, guild_id: int) -> GuildConfig:
+        config = await self.get(guild_id)
+        if config is None:
+            config, _ = await GuildConfig.get_or_create(guild_id=guild_id)
+            self.configs[guild_id] = config
+        return config
+
+    async def save(self, config: GuildConfig):
+        await config.save()
+        self.configs[config.guild_id] = config
@@ -1,116 +1,385 @@
+import logging
+import os
 import textwrap
+import threading
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING
+from io import BytesIO
+from typing import TYPE_CHECKING, Callable, Hashable, Iterable
 
+from cachetools import LRUCache, cached
 from PIL import Image, ImageDraw, ImageFont, ImageOps
 
+from carfigures.settings import settings
+
 if TYPE_CHECKING:
     from carfigures.core.models import CarInstance, Event
 
+log = logging.getLogger("carfigures.core.utils.imagers")
+
 CARD_CORNERS = ((0, 181), (1428, 948))
-artwork_size = [b - a for a, b in zip(*CARD_CORNERS)]
 
 
-def draw_card(instance: "CarInstance"):
-    car = instance.carfigure
-    car_weight = (255, 255, 255, 255)
+@cached(LRUCache(maxsize=64), lock=threading.Lock(), info=True)
+def load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """
+    Load a TrueType font, reusing the parsed font when the same path and size were already
+    requested. Use `load_font.cache_info()` for hits and misses, and `load_font.cache_clear()`
+    when the fonts packs are reloaded.
+    """
+    return ImageFont.truetype(path, size)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    sources: frozenset[str]
+    stamp: tuple[int, ...]
+    image: Image.Image
+
+
+class ImageCache:
+    """
+    Memory-budgeted LRU cache of decoded and drawn images, shared by every render of the process.
+
+    Each entry records the files it was built from, and is rebuilt when one of them is modified
+    on disk. Entries can also be dropped explicitly with `discard` when the catalog stops
+    referencing a file. Cached images must never be modified, copy them before drawing.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._cache: LRUCache[Hashable, CacheEntry] | None = None
+
+    @staticmethod
+    def _getsizeof(entry: CacheEntry) -> int:
+        image = entry.image
+        return image.width * image.height * len(image.getbands())
+
+    @property
+    def cache(self) -> LRUCache[Hashable, CacheEntry]:
+        # created lazily, the settings are not loaded yet when this module is imported
+        if self._cache is None:
+            self._cache = LRUCache(
+                maxsize=settings.image_cache_size * 1024**2, getsizeof=self._getsizeof
+            )
+        return self._cache
+
+    @property
+    def currsize(self) -> int:
+        """
+        Number of bytes held by the cached images.
+        """
+        return self.cache.currsize
+
+    def get(
+        self, key: Hashable, sources: tuple[str, ...], build: Callable[[], Image.Image]
+    ) -> Image.Image:
+        """
+        Return the image stored under `key`, calling `build` only when it is missing or when
+        one of its `sources` files changed since.
+        """
+        stamp = tuple(os.stat(path).st_mtime_ns for path in sources)
+        with self.lock:
+            entry = self.cache.get(key)
+        if entry and entry.stamp == stamp:
+            return entry.image
+        image = build()
+        with self.lock:
+            try:
+                self.cache[key] = CacheEntry(frozenset(sources), stamp, image)
+            except ValueError:  # larger than the whole cache, keep it uncached
+                pass
+        return image
+
+    def discard(self, paths: Iterable[str]):
+        """
+        Remove every entry built from one of the given paths.
+        """
+        paths = set(paths)
+        with self.lock:
+            for key in [key for key, entry in self.cache.items() if entry.sources & paths]:
+                del self.cache[key]
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+
+images = ImageCache()
+
+
+def _decode(path: str, prepare: Callable[[Image.Image], Image.Image]) -> Image.Image:
+    with Image.open(path) as image:
+        return prepare(image.convert("RGBA"))
+
+
+def open_template(path: str, scale: float = 1.0) -> Image.Image:
+    """
+    Background of a card or a banner, converted to RGBA and resized by `scale`.
+    """
+
+    def prepare(image: Image.Image) -> Image.Image:
+        if scale == 1:
+            return image
+        size = (round(image.width * scale), round(image.height * scale))
+        return image.resize(size, Image.Resampling.LANCZOS)
+
+    return images.get(("template", path, scale), (path,), lambda: _decode(path, prepare))
+
+
+def open_artwork(path: str, size: tuple[int, int]) -> Image.Image:
+    """
+    Collection artwork, converted to RGBA and fitted to the card's artwork area.
+    """
+    return images.get(
+        ("artwork", path, size), (path,), lambda: _decode(path, lambda x: ImageOps.fit(x, size))
+    )
 
-    if instance.exclusive_card:
-        image = Image.open("." + instance.exclusive_card.image)
-        fonts = instance.exclusive_card.cachedFontsPack
-    elif instance.event_card:
-        image = Image.open("." + instance.event_card.card)
-        fonts = instance.event_card.cachedFontsPack
-    else:
-        image = Image.open("." + car.cached_album.image)
-        fonts = car.cached_album.cachedFontsPack
-    image = image.convert("RGBA")
-    icon = Image.open("." + car.cached_country.image).convert("RGBA") if car.cached_country else None
+
+def open_icon(path: str, size: int) -> Image.Image:
+    """
+    Country icon, converted to RGBA and fitted to the top right corner of the card.
+    """
+    return images.get(
+        ("icon", path, size),
+        (path,),
+        lambda: _decode(path, lambda x: ImageOps.fit(x, (size, size))),
+    )
+
+
+def tier_scale(tier: str) -> float:
+    """
+    Scale of the cards drawn for the given tier, `"full"` or `"preview"`.
+    """
+    if tier == "full":
+        return 1.0
+    if tier == "preview":
+        return settings.preview_scale
+    raise ValueError(f'Unknown card tier "{tier}", expected "full" or "preview"')
+
+
+@dataclass(frozen=True)
+class CardTemplate:
+    """
+    Everything drawn on a card that is shared by all the instances of a car in a given
+    album, exclusive or event variant. Only the stats are left to draw per instance.
+
+    Paths are relative to the working directory, ready to be opened.
+    """
+
+    background: str
+    artwork: str
+    icon: str | None
+    title_font: str
+    capacity_name_font: str
+    capacity_description_font: str
+    stats_font: str
+    credits_font: str
+    title: str
+    capacity_name: str
+    capacity_description: str
+    credits: str
+
+    @classmethod
+    def from_instance(cls, instance: "CarInstance") -> "CardTemplate":
+        car = instance.carfigure
+        if instance.exclusive_card:
+            background = instance.exclusive_card.image
+            fonts = instance.exclusive_card.cachedFontsPack
+        elif instance.event_card:
+            background = instance.event_card.card
+            fonts = instance.event_card.cachedFontsPack
+        else:
+            background = car.cached_album.image
+            fonts = car.cached_album.cachedFontsPack
+        return cls(
+            background="." + background,
+            artwork="." + car.collectionPicture,
+            icon="." + car.cached_country.image if car.cached_country else None,
+            title_font="." + fonts.title,
+            capacity_name_font="." + fonts.capacityn,
+            capacity_description_font="." + fonts.capacityd,
+            stats_font="." + fonts.stats,
+            credits_font="." + fonts.credits,
+            title=car.shortName or car.fullName,
+            capacity_name=car.capacityName,
+            capacity_description=car.capacityDescription,
+            credits=car.carCredits,
+        )
+
+    @property
+    def sources(self) -> tuple[str, ...]:
+        """
+        Files the static layer is drawn from, so that replacing any of them redraws it.
+        """
+        images = (self.background, self.artwork)
+        if self.icon:
+            images += (self.icon,)
+        fonts = (
+            self.title_font,
+            self.capacity_name_font,
+            self.capacity_description_font,
+            self.credits_font,
+        )
+        return images + fonts
+
+
+def _scaler(scale: float) -> Callable[[int], int]:
+    """
+    Return a function converting a length of the full size card to the given scale.
+    """
+    return lambda value: max(1, round(value * scale)) if value else 0
+
+
+def draw_static_layer(template: CardTemplate, scale: float = 1.0) -> Image.Image:
+    """
+    Draw the parts of a card that don't depend on the instance.
+    """
+    px = _scaler(scale)
+    image = open_template(template.background, scale).copy()
 
     # Load fonts with dynamic sizes
-    titleFont = ImageFont.truetype("." + fonts.title, 140)
-    capacityNFont = ImageFont.truetype("." + fonts.capacityn, 110)
-    capacityDFont = ImageFont.truetype("." + fonts.capacityd, 75)
-    statsFont = ImageFont.truetype("." + fonts.stats, 130)
-    creditsFont = ImageFont.truetype("." + fonts.credits, 40)
+    titleFont = load_font(template.title_font, px(140))
+    capacityNFont = load_font(template.capacity_name_font, px(110))
+    capacityDFont = load_font(template.capacity_description_font, px(75))
+    creditsFont = load_font(template.credits_font, px(40))
 
     draw = ImageDraw.Draw(image)
     draw.text(
-        (30, 0),
-        car.shortName or car.fullName,
+        (px(30), 0),
+        template.title,
         font=titleFont,
         fill=(255, 255, 255, 255),
-        stroke_width=2,
+        stroke_width=px(2),
         stroke_fill=(0, 0, 0, 255),
     )
-    for i, line in enumerate(textwrap.wrap(f"Ability: {car.capacityName}", width=26)):
+    for i, line in enumerate(textwrap.wrap(f"Ability: {template.capacity_name}", width=26)):
         draw.text(
-            (100, 1050 + 100 * i),
+            (px(100), px(1050 + 100 * i)),
             line,
             font=capacityNFont,
             fill=(255, 255, 255, 255),
-            stroke_width=2,
+            stroke_width=px(2),
             stroke_fill=(0, 0, 0, 255),
         )
-    for i, line in enumerate(textwrap.wrap(car.capacityDescription, width=32)):
+    for i, line in enumerate(textwrap.wrap(template.capacity_description, width=32)):
         draw.text(
-            (60, 1300 + 60 * i),
+            (px(60), px(1300 + 60 * i)),
             line,
             font=capacityDFont,
-            stroke_width=1,
+            stroke_width=px(1),
             stroke_fill=(0, 0, 0, 255),
         )
     draw.text(
-        (320, 1660),
-        str(instance.weight),
-        font=statsFont,
-        fill=car_weight,
-        stroke_width=1,
+        (px(30), px(1870)),
+        f"Credits:\n{template.credits}\n",
+        font=creditsFont,
+        fill=(255, 255, 255, 255),
+        stroke_width=px(2),
         stroke_fill=(0, 0, 0, 255),
     )
+
+    corners = tuple((px(x), px(y)) for x, y in CARD_CORNERS)
+    size = (corners[1][0] - corners[0][0], corners[1][1] - corners[0][1])
+    image.paste(open_artwork(template.artwork, size), corners[0])
+
+    if template.icon:
+        icon = open_icon(template.icon, px(181))
+        image.paste(icon, (image.width - icon.width, 0), mask=icon)
+
+    return image
+
+
+def static_layer(template: CardTemplate, scale: float = 1.0) -> Image.Image:
+    """
+    Cached version of `draw_static_layer`. The returned image must be copied before drawing.
+    """
+    return images.get(
+        ("static", template, scale),
+        template.sources,
+        lambda: draw_static_layer(template, scale),
+    )
+
+
+def render_card(
+    template: CardTemplate, weight: int, horsepower: int, scale: float = 1.0
+) -> Image.Image:
+    """
+    Finish a card by drawing the instance's stats on a copy of its static layer.
+    """
+    px = _scaler(scale)
+    image = static_layer(template, scale).copy()
+    statsFont = load_font(template.stats_font, px(130))
+
+    draw = ImageDraw.Draw(image)
     draw.text(
-        (1120, 1660),
-        str(instance.horsepower),
+        (px(320), px(1660)),
+        str(weight),
         font=statsFont,
         fill=(255, 255, 255, 255),
-        stroke_width=1,
+        stroke_width=px(1),
         stroke_fill=(0, 0, 0, 255),
-        anchor="ra",
     )
     draw.text(
-        (30, 1870),
-        f"Credits:\n{car.carCredits}\n",
-        font=creditsFont,
+        (px(1120), px(1660)),
+        str(horsepower),
+        font=statsFont,
         fill=(255, 255, 255, 255),
-        stroke_width=2,
+        stroke_width=px(1),
         stroke_fill=(0, 0, 0, 255),
+        anchor="ra",
     )
 
-    artwork = Image.open("." + car.collectionPicture).convert("RGBA")
-    image.paste(ImageOps.fit(artwork, artwork_size), CARD_CORNERS[0])  # type: ignore
+    return image
 
-    if icon:
-        icon = ImageOps.fit(icon, (181, 181))
-        image.paste(icon, (1247, 0), mask=icon)
-        icon.close()
-    artwork.close()
 
-    return image
+def draw_card(instance: "CarInstance", scale: float = 1.0):
+    return render_card(
+        CardTemplate.from_instance(instance), instance.weight, instance.horsepower, scale
+    )
 
 
-def draw_banner(event: "Event"):
-    image = Image.open("." + event.banner)
-    image = image.convert("RGBA")
+@dataclass(frozen=True)
+class BannerTemplate:
+    """
+    Everything drawn on an event banner, including whether the event is still live.
+    """
+
+    banner: str
+    title_font: str
+    description_font: str
+    status_font: str
+    credits_font: str
+    name: str
+    description: str
+    live: bool
+
+    @classmethod
+    def from_event(cls, event: "Event") -> "BannerTemplate":
+        fonts = event.cachedFontsPack
+        return cls(
+            banner="." + event.banner,
+            title_font="." + fonts.title,
+            description_font="." + fonts.capacityd,
+            status_font="." + fonts.capacityn,
+            credits_font="." + fonts.stats,
+            name=event.name,
+            description=event.description,
+            live=event.endDate > datetime.now(timezone.utc),
+        )
+
+
+def render_banner(template: BannerTemplate) -> Image.Image:
+    image = open_template(template.banner).copy()
     draw = ImageDraw.Draw(image)
 
     imageWidth, imageHeight = image.size
-    fonts = event.cachedFontsPack
 
     # Dynamically Resize the text based on the banner size
-    title_font = ImageFont.truetype(str("." + fonts.title), int(imageWidth * 0.03))
-    description_font = ImageFont.truetype(str("." + fonts.capacityd), int(imageWidth * 0.025))
-    status_font = ImageFont.truetype(str("." + fonts.capacityn), int(imageWidth * 0.02))
-    credits_font = ImageFont.truetype(str("." + fonts.stats), int(imageWidth * 0.015))
+    title_font = load_font(template.title_font, int(imageWidth * 0.03))
+    description_font = load_font(template.description_font, int(imageWidth * 0.025))
+    status_font = load_font(template.status_font, int(imageWidth * 0.02))
+    credits_font = load_font(template.credits_font, int(imageWidth * 0.015))
 
     # Dynamically position the text
     title_position = (int(imageWidth * 0.015), int(imageHeight * 0.01))
@@ -119,14 +388,14 @@ def draw_banner(event: "Event"):
     credits_position = (int(imageWidth * 0.99), int(imageHeight * 0.95))
     draw.text(
         title_position,
-        event.name,
+        template.name,
         font=title_font,
         fill=(255, 255, 255, 255),
         stroke_fill=(0, 0, 0, 255),
         stroke_width=2,
     )
 
-    for i, line in enumerate(textwrap.wrap(event.description, width=100)):
+    for i, line in enumerate(textwrap.wrap(template.description, width=100)):
         draw.text(
             (title_position[0], description_position + i * int(imageWidth * 0.025) * 2),
             line,
@@ -144,7 +413,7 @@ def draw_banner(event: "Event"):
         stroke_fill=(0, 0, 0, 255),
         stroke_width=1,
     )
-    eventstatus = "Live!" if event.endDate > datetime.now(timezone.utc) else "Ended!"
+    eventstatus = "Live!" if template.live else "Ended!"
     draw.text(
         (status_position[0] + int(imageWidth * 0.12), status_position[1]),
         eventstatus,
@@ -165,3 +434,126 @@ def draw_banner(event: "Event"):
     )
 
     return image
+
+
+def draw_banner(event: "Event"):
+    return render_banner(BannerTemplate.from_event(event))
+
+
+@dataclass(frozen=True)
+class Encoder:
+    """
+    How rendered images are encoded before being sent.
+
+    Parameters
+    ----------
+    format: str
+        `"png"` or `"webp"`.
+    compress_level: int
+        zlib level of PNG files, from 0 (fastest, largest) to 9 (slowest, smallest).
+    quantize: bool
+        Reduce PNG files to a 256 colors palette, much smaller but with some banding.
+    lossless: bool
+        Encode WebP files without any loss, otherwise `quality` is used.
+    quality: int
+        Quality of lossy WebP files, from 0 to 100. For lossless files, this is the effort
+        spent compressing instead.
+    """
+
+    format: str = "png"
+    compress_level: int = 6
+    quantize: bool = False
+    lossless: bool = False
+    quality: int = 90
+
+    def __post_init__(self):
+        if self.format not in ("png", "webp"):
+            raise ValueError(f'Unknown image format "{self.format}", expected "png" or "webp"')
+        if not 0 <= self.compress_level <= 9:
+            raise ValueError(f"PNG compress level must be from 0 to 9, got {self.compress_level}")
+        if not 0 <= self.quality <= 100:
+            raise ValueError(f"WebP quality must be from 0 to 100, got {self.quality}")
+
+    @classmethod
+    def from_settings(cls) -> "Encoder":
+        return cls(
+            settings.image_format,
+            settings.png_compress_level,
+            settings.png_quantize,
+            settings.webp_lossless,
+            settings.webp_quality,
+        )
+
+    @property
+    def extension(self) -> str:
+        return self.format
+
+    @property
+    def media_type(self) -> str:
+        return f"image/{self.format}"
+
+    def encode(self, image: Image.Image) -> BytesIO:
+        buffer = BytesIO()
+        if self.format == "webp":
+            image.save(buffer, format="webp", lossless=self.lossless, quality=self.quality)
+        elif self.quantize:
+            palette = image.quantize(256, method=Image.Quantize.FASTOCTREE)
+            palette.save(buffer, format="png", compress_level=self.compress_level)
+            palette.close()
+        else:
+            image.save(buffer, format="png", compress_level=self.compress_level)
+        buffer.seek(0)
+        return buffer
+
+
+def _to_buffer(image: Image.Image) -> BytesIO:
+    buffer = Encoder.from_settings().encode(image)
+    image.close()
+    return buffer
+
+
+# The two functions below only take picklable arguments and return picklable results,
+# they are the entry points of the render workers.
+
+
+def card_buffer(
+    template: CardTemplate, weight: int, horsepower: int, scale: float = 1.0
+) -> BytesIO:
+    """
+    Render a card and encode it, ready to be sent.
+    """
+    return _to_buffer(render_card(template, weight, horsepower, scale))
+
+
+def banner_buffer(template: BannerTemplate) -> BytesIO:
+    """
+    Render an event banner and encode it, ready to be sent.
+    """
+    return _to_buffer(render_banner(template))
+
+
+def preload(fonts: Iterable[str], backgrounds: Iterable[str]):
+    """
+    Fill the caches of this process ahead of the first renders.
+
+    Parameters
+    ----------
+    fonts: Iterable[str]
+        Paths of the fonts files, loaded at every size used by the cards of the default tier.
+    backgrounds: Iterable[str]
+        Paths of the card backgrounds, resized for the default tier.
+    """
+    scale = tier_scale(settings.card_tier)
+    px = _scaler(scale)
+    for path in fonts:
+        try:
+            # sizes used by draw_static_layer and render_card
+            for size in (140, 110, 75, 130, 40):
+                load_font(path, px(size))
+        except OSError:
+            log.warning(f"Could not preload font {path}", exc_info=True)
+    for path in backgrounds:
+        try:
+            open_template(path, scale)
+        except OSError:
+            log.warning(f"Could not preload background {path}", exc_info=True)
@@ -0,0 +1,48 @@
+import asyncio
+from time import monotonic
+
+
+class TokenBucket:
+    """
+    Rate limiter letting `rate` actions per second through on average, with bursts of up to
+    `burst` actions after a quiet period.
+
+    Waiters are served in order, so a steady flow of callers is spread evenly over time instead
+    of being released all at once when tokens come back.
+
+    Parameters
+    ----------
+    rate: float
+        Tokens added per second. 0 disables the limit.
+    burst: int
+        Maximum number of tokens kept, the bucket starts full.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        if rate < 0:
+            raise ValueError("The rate must be positive or zero")
+        if burst < 1:
+            raise ValueError("The burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """
+        Wait until a token is available and take it.
+        """
+        if not self.rate:
+            return
+        async with self.lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Iterable, TypeVar
+
+from prometheus_client import Gauge
+
+from carfigures.core.utils import imagers
+from carfigures.settings import Settings, settings
+
+log = logging.getLogger("carfigures.core.utils.rendering")
+T = TypeVar("T")
+
+render_queue = Gauge("render_queue", "Renders waiting for a free render worker")
+render_in_flight = Gauge("render_in_flight", "Renders currently processed by the render workers")
+
+
+def _init_worker(config: Settings, fonts: list[str], backgrounds: list[str]):
+    # worker processes don't share our memory, copy the settings and fill the caches once
+    for key, value in vars(config).items():
+        setattr(settings, key, value)
+    imagers.preload(fonts, backgrounds)
+
+
+class RenderPool:
+    """
+    Long-lived executor drawing cards and banners outside of the event loop.
+
+    Parameters
+    ----------
+    mode: str
+        `"thread"` to render in threads of the bot's process, sharing its caches, or
+        `"process"` to render in separate processes that don't contend for the GIL with the
+        gateway. Worker processes preload the fonts and backgrounds of the catalog.
+    workers: int | None
+        Number of threads or processes, defaults to the number of CPUs.
+    max_in_flight: int
+        Maximum number of renders submitted to the workers at once, the next ones are queued.
+    """
+
+    def __init__(self, mode: str = "thread", workers: int | None = None, max_in_flight: int = 32):
+        if mode not in ("thread", "process"):
+            raise ValueError(f'Unknown render mode "{mode}", expected "thread" or "process"')
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.executor: Executor | None = None
+
+    def start(self, fonts: Iterable[str] = (), backgrounds: Iterable[str] = ()):
+        """
+        Start the workers. In process mode, calling this again replaces the workers with new
+        ones preloading the given assets, while the renders in progress finish on the old ones.
+        Threads share the caches of the bot and are only started once.
+        """
+        if self.mode == "thread":
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="render")
+            return
+
+        previous = self.executor
+        # spawned rather than forked, a fork could copy a lock held by another thread of the bot
+        self.executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(settings, list(fonts), list(backgrounds)),
+        )
+        if previous:
+            previous.shutdown(wait=False)
+        log.info(f"Started {self.workers} render processes")
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """
+        Run `func(*args)` in a worker once a slot is available. In process mode, the function
+        and its arguments must be picklable.
+        """
+        if self.executor is None:
+            self.start()
+        render_queue.inc()
+        try:
+            await self.semaphore.acquire()
+        finally:
+            render_queue.dec()
+        render_in_flight.inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            render_in_flight.dec()
+            self.semaphore.release()
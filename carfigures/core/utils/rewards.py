@@ -0,0 +1,104 @@
+from bisect import bisect_right
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, Protocol, Sequence, TypeVar
+
+from carfigures.core.utils.sampling import AliasSampler
+
+if TYPE_CHECKING:
+    from carfigures.core.models import Event, Exclusive
+
+
+class Card(Protocol):
+    rarity: float
+
+
+C = TypeVar("C", bound=Card)
+# start, end and sampler of the events of a window of the schedule, `None` bounds are unbounded
+Window = tuple["datetime | None", "datetime | None", "AliasSampler[Event | None] | None"]
+
+
+def with_common(cards: Sequence[C]) -> AliasSampler[C | None]:
+    """
+    Sampler drawing one of the cards, or `None` for the common card. Rarities are between 0
+    and 1, the common card weighs the sum of what each card leaves (1 - rarity).
+    """
+    weights = [min(max(card.rarity, 0.0), 1.0) for card in cards]
+    return AliasSampler([*cards, None], [*weights, sum(1 - weight for weight in weights)])
+
+
+class RewardSampler:
+    """
+    Exclusive and event cards given on catches, compiled when the cache is reloaded.
+
+    Exclusives are grouped in tiers by rebirths required, each tier with its own sampler of
+    the exclusives it unlocks. Events are laid out on a schedule split at every start and end
+    date, each window with the sampler of the events running during it. The current window is
+    kept and only replaced once its end is reached, so a catch costs a comparison and a draw.
+
+    An event runs from its start date included to its end date excluded.
+    """
+
+    def __init__(self):
+        self.thresholds: list[int] = []
+        self.tiers: list[AliasSampler["Exclusive | None"]] = []
+        self.boundaries: list[datetime] = []
+        self.windows: list[AliasSampler["Event | None"] | None] = [None]
+        self.window: Window = (None, None, None)
+
+    def rebuild(self, exclusives: Iterable["Exclusive"], events: Iterable["Event"]):
+        exclusives = sorted(exclusives, key=lambda x: x.rebirthRequired)
+        thresholds = sorted({exclusive.rebirthRequired for exclusive in exclusives})
+        tiers = [
+            with_common([x for x in exclusives if x.rebirthRequired <= threshold])
+            for threshold in thresholds
+        ]
+
+        events = list(events)
+        boundaries = sorted(
+            {date for event in events for date in (event.startDate, event.endDate)}
+        )
+        # windows[i] covers from boundaries[i - 1] to boundaries[i]
+        windows: list[AliasSampler["Event | None"] | None] = [None]
+        for start in boundaries:
+            running = [x for x in events if x.startDate <= start < x.endDate]
+            windows.append(with_common(running) if running else None)
+
+        self.thresholds, self.tiers = thresholds, tiers
+        self.boundaries, self.windows = boundaries, windows
+        # an empty window forces a lookup on the next draw
+        self.window = (boundaries[0], boundaries[0], None) if boundaries else (None, None, None)
+
+    @property
+    def has_exclusives(self) -> bool:
+        return bool(self.tiers)
+
+    def exclusive_sampler(self, rebirths: int) -> AliasSampler["Exclusive | None"] | None:
+        tier = bisect_right(self.thresholds, rebirths) - 1
+        return self.tiers[tier] if tier >= 0 else None
+
+    def event_sampler(self, now: datetime) -> AliasSampler["Event | None"] | None:
+        start, end, sampler = self.window
+        if (start is None or start <= now) and (end is None or now < end):
+            return sampler
+        index = bisect_right(self.boundaries, now)
+        start = self.boundaries[index - 1] if index > 0 else None
+        end = self.boundaries[index] if index < len(self.boundaries) else None
+        self.window = (start, end, self.windows[index])
+        return self.windows[index]
+
+    def exclusive(self, rebirths: int) -> "Exclusive | None":
+        """
+        Draw the exclusive card of a catch, once the exclusive chance succeeded.
+        """
+        sampler = self.exclusive_sampler(rebirths)
+        return sampler.sample() if sampler else None
+
+    def event(self, now: datetime) -> "Event | None":
+        """
+        Draw the event card of a catch made at `now`.
+        """
+        sampler = self.event_sampler(now)
+        return sampler.sample() if sampler else None
+
+
+catch_rewards = RewardSampler()
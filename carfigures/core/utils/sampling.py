@@ -0,0 +1,105 @@
+import math
+import random
+from typing import Generic, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class AliasSampler(Generic[T]):
+    """
+    Weighted random choice in constant time, using Vose's alias method.
+
+    The tables are built once in O(n) by `rebuild`, then each draw costs two random numbers
+    whatever the size of the population. Rebuilding swaps the tables at once, draws running
+    concurrently always see a consistent population.
+
+    Parameters
+    ----------
+    population: Sequence[T]
+        Items to draw from.
+    weights: Sequence[float]
+        Relative weight of each item, they must be finite, positive or zero, and not all zero.
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self, population: Sequence[T] = (), weights: Sequence[float] = ()):
+        self._table: tuple[tuple[T, ...], tuple[float, ...], tuple[int, ...]] = ((), (), ())
+        if population:
+            self.rebuild(population, weights)
+
+    def __len__(self) -> int:
+        return len(self._table[0])
+
+    @property
+    def population(self) -> tuple[T, ...]:
+        return self._table[0]
+
+    def rebuild(self, population: Sequence[T], weights: Sequence[float]):
+        """
+        Replace the population and its weights. An empty population empties the sampler.
+
+        Raises
+        ------
+        ValueError
+            The weights are invalid or don't match the population.
+        """
+        if len(population) != len(weights):
+            raise ValueError("The population and the weights must have the same length")
+        if not population:
+            self._table = ((), (), ())
+            return
+        for weight in weights:
+            if not math.isfinite(weight) or weight < 0:
+                raise ValueError(f"Invalid weight {weight!r}, weights must be positive numbers")
+        total = math.fsum(weights)
+        if total <= 0:
+            raise ValueError("At least one weight must be greater than zero")
+
+        size = len(population)
+        scaled = [weight * size / total for weight in weights]
+        probability = [1.0] * size
+        alias = list(range(size))
+        small = [i for i, x in enumerate(scaled) if x < 1]
+        large = [i for i, x in enumerate(scaled) if x >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+        # whatever is left only misses its column by rounding errors, keep probability at 1
+
+        self._table = (tuple(population), tuple(probability), tuple(alias))
+
+    def sample(self) -> T:
+        """
+        Draw one item.
+
+        Raises
+        ------
+        IndexError
+            The sampler is empty.
+        """
+        population, probability, alias = self._table
+        column = int(random.random() * len(population))
+        return population[column if random.random() < probability[column] else alias[column]]
+
+    def sample_many(self, amount: int) -> list[T]:
+        """
+        Draw `amount` items independently, with replacement.
+        """
+        population, probability, alias = self._table
+        size = len(population)
+        if not size and amount:
+            raise IndexError("Cannot sample from an empty sampler")
+        result: list[T] = []
+        for _ in range(amount):
+            column = int(random.random() * size)
+            result.append(
+                population[column if random.random() < probability[column] else alias[column]]
+            )
+        return result
@@ -0,0 +1,93 @@
+import logging
+import os
+import pickle
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from tortoise.models import Model
+
+from carfigures.core.models import GuildConfig
+
+log = logging.getLogger("carfigures.core.utils.snapshot")
+
+# bumped when the content of `Snapshot` or the fields of the cached models change, older
+# files are ignored
+SNAPSHOT_VERSION = 2
+
+# names of the catalog caches of `carfigures.core.models`
+CATALOGS = ("cars", "cartypes", "countries", "events", "exclusives", "fontspacks")
+
+
+@dataclass
+class Snapshot:
+    """
+    State of the bot's in-memory caches, written to disk to restart without waiting for the
+    database and without losing the spawn progress of the guilds.
+
+    Attributes
+    ----------
+    catalog: dict[str, dict[int, Model]]
+        Content of the catalog caches, indexed by their name in `CATALOGS`.
+    blacklisted_users: set[int]
+    blacklisted_servers: set[int]
+    guild_configs: list[GuildConfig]
+        Configs held by the guild configs cache.
+    spawn_channels: dict[int, int]
+        Spawn channel of each guild where spawn is enabled.
+    cooldowns: dict[int, tuple[datetime, float, int]]
+        Start time, message count and goal of the spawn progress of each guild. The message
+        window isn't kept, its hashes are only valid in the process that computed them.
+    created_at: datetime
+    """
+
+    catalog: dict[str, dict[int, Model]]
+    blacklisted_users: set[int]
+    blacklisted_servers: set[int]
+    guild_configs: list[GuildConfig]
+    spawn_channels: dict[int, int] = field(default_factory=dict)
+    cooldowns: dict[int, tuple[datetime, float, int]] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def encode(snapshot: Snapshot) -> bytes:
+    """
+    Serialize the snapshot. This should run in the event loop so that the caches don't change
+    while they are read.
+    """
+    return pickle.dumps((SNAPSHOT_VERSION, snapshot), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def write(path: Path, data: bytes):
+    """
+    Replace the snapshot file with `data` atomically, a crash while writing leaves the previous
+    snapshot intact.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def read(path: Path) -> Snapshot | None:
+    """
+    Load the snapshot file, or return `None` if it's missing, unreadable or from another
+    version of the bot.
+
+    The file is unpickled, it must only be writable by the bot.
+    """
+    try:
+        with open(path, "rb") as file:
+            version, snapshot = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        log.warning(f"Could not read the snapshot {path}, ignoring it", exc_info=True)
+        return None
+    if version != SNAPSHOT_VERSION or not isinstance(snapshot, Snapshot):
+        log.warning(f"The snapshot {path} is from another version, ignoring it")
+        return None
+    return snapshot
@@ -0,0 +1,78 @@
+import logging
+import os
+import threading
+from io import BytesIO
+from typing import Iterable, NamedTuple
+
+log = logging.getLogger("carfigures.core.utils.spawnassets")
+
+
+class SpawnAsset(NamedTuple):
+    stamp: tuple[int, int]
+    data: bytes
+
+
+class SpawnAssetStore:
+    """
+    Spawn pictures of the enabled cars, kept in memory so that spawns don't read the disk.
+
+    The store is filled by `load` when the cache is reloaded. Pictures replaced on disk, or
+    requested while missing from the store because the car was edited in the meantime, are
+    read again on their next spawn.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.assets: dict[str, SpawnAsset] = {}
+
+    @property
+    def size(self) -> int:
+        """
+        Number of bytes held by the stored pictures.
+        """
+        with self.lock:
+            return sum(len(asset.data) for asset in self.assets.values())
+
+    @staticmethod
+    def _stamp(path: str) -> tuple[int, int]:
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _read(self, path: str) -> SpawnAsset:
+        stamp = self._stamp(path)
+        with open(path, "rb") as file:
+            asset = SpawnAsset(stamp, file.read())
+        with self.lock:
+            self.assets[path] = asset
+        return asset
+
+    def load(self, paths: Iterable[str]):
+        """
+        Store the given pictures, reading only the new or modified ones, and drop the others.
+        This does blocking I/O, run it in a thread.
+        """
+        paths = set(paths)
+        with self.lock:
+            for path in self.assets.keys() - paths:
+                del self.assets[path]
+        for path in paths:
+            asset = self.assets.get(path)
+            try:
+                if asset is None or asset.stamp != self._stamp(path):
+                    self._read(path)
+            except OSError:
+                log.warning(f"Could not load spawn picture {path}", exc_info=True)
+        log.debug(f"{len(self.assets)} spawn pictures loaded, {self.size} bytes")
+
+    def open(self, path: str) -> BytesIO:
+        """
+        Return a new file object over the stored picture. It shares the memory of the store
+        until written to, so each spawn gets its own position without copying the picture.
+        """
+        asset = self.assets.get(path)
+        if asset is None or asset.stamp != self._stamp(path):
+            asset = self._read(path)
+        return BytesIO(asset.data)
+
+
+pictures = SpawnAssetStore()
@@ -9,4 +9,7 @@ if TYPE_CHECKING:
 async def setup(bot: "CarFiguresBot"):
     cog = CarFiguresSpawner(bot)
     await bot.add_cog(cog)
-    await cog.load_cache()
+    if bot.snapshot:
+        cog.restore(bot.snapshot)  # the bot reconciles it with the database afterwards
+    else:
+        await cog.load_cache()
@@ -1,11 +1,13 @@
 import logging
 import random
 import string
+import uuid
 from datetime import datetime
 
 import discord
 
-from carfigures.core.models import GuildConfig, Car, cars
+from carfigures.core.models import GuildConfig, Car, spawnable_cars
+from carfigures.core.utils import spawnassets
 from carfigures.packages.carfigures.components import CatchView
 from carfigures.settings import settings
 
@@ -22,19 +24,40 @@ class CarFigure:
         self.message: discord.Message = discord.utils.MISSING
         self.caught = False
         self.time = datetime.now()
+        # recorded on the caught instance, the database refuses a second catch of this spawn
+        self.token = uuid.uuid4()
+
+    def claim(self) -> bool:
+        """
+        Mark the carfigure as caught, and return `False` if it already was.
+
+        This must be called without awaiting anything between the check and the catch, so that
+        only one of the concurrent catch attempts wins.
+        """
+        if self.caught:
+            return False
+        self.caught = True
+        return True
 
     @classmethod
     async def get_random(cls):
         """
         A method to get a random Car instance from a list of enabled cars based on their rarity.
         """
-        carfigures = list(filter(lambda carfigure: carfigure.enabled, cars.values()))
-        if not carfigures:
+        if not spawnable_cars:
+            raise RuntimeError("No car to spawn")
+        return cls(spawnable_cars.sample())
+
+    @classmethod
+    async def get_random_many(cls, amount: int) -> list["CarFigure"]:
+        """
+        Same as `get_random`, drawing `amount` cars at once.
+        """
+        if not spawnable_cars:
             raise RuntimeError("No car to spawn")
-        cf = random.choices(population=carfigures, weights=[carfigure.rarity for carfigure in carfigures], k=1)[0]
-        return cls(cf)
+        return [cls(car) for car in spawnable_cars.sample_many(amount)]
 
-    async def spawn(self, channel: discord.TextChannel) -> bool:
+    async def spawn(self, channel: discord.TextChannel, config: GuildConfig | None = None) -> bool:
         """
         Spawn a carfigure in a channel.
         Parameters
@@ -42,6 +65,8 @@ class CarFigure:
         channel: discord.TextChannel
             The channel where to spawn the carfigure. Must have permission to send messages
             and upload files as a bot (not through interactions).
+        config: GuildConfig | None
+            The config of the channel's guild, used to mention the spawn role.
         Returns
         -------
         bool
@@ -58,16 +83,11 @@ class CarFigure:
 
         assert channel.guild
         extension = self.model.spawnPicture.split(".")[-1]
-        filelocation = "." + self.model.spawnPicture
+        picture = spawnassets.pictures.open("." + self.model.spawnPicture)
         filename = f"nt_{generate_random_name()}.{extension}"
-        guild = await GuildConfig.get(guild_id=channel.guild.id)
-        role = channel.guild.get_role(guild.spawnRole) if guild.spawnRole else None
+        role = channel.guild.get_role(config.spawnRole) if config and config.spawnRole else None
 
-        message = random.choices(
-            population=[mmessage["message"] for mmessage in settings.spawn_messages],
-            weights=[int(mmessage["rarity"]) for mmessage in settings.spawn_messages],
-            k=1,
-        )[0]
+        message = settings.spawn_messages.sample()
         if role:
             message += f" {role.mention}"
         try:
@@ -76,7 +96,7 @@ class CarFigure:
                 self.message = await channel.send(
                     message,
                     view=CatchView(self),
-                    file=discord.File(filelocation, filename=filename),
+                    file=discord.File(picture, filename=filename),
                 )
                 return True
             else:
@@ -2,33 +2,50 @@ import logging
 from typing import TYPE_CHECKING, Optional
 
 import discord
-from discord.ext import commands
-from tortoise.exceptions import DoesNotExist
+from discord.ext import commands, tasks
 
-from carfigures.core.models import GuildConfig
 from carfigures.packages.carfigures.spawn import SpawnManager
+from carfigures.settings import settings
 
 if TYPE_CHECKING:
     from carfigures.core.bot import CarFiguresBot
+    from carfigures.core.utils.snapshot import Snapshot
 
 log = logging.getLogger("carfigures.packages.carfigures")
 
 
 class CarFiguresSpawner(commands.Cog):
     def __init__(self, bot: "CarFiguresBot"):
-        self.spawn_manager = SpawnManager()
+        self.spawn_manager = SpawnManager(bot.guild_configs)
         self.bot = bot
 
+    async def cog_load(self):
+        self.spawn_manager.queue.start()
+        self.evict_idle_cooldowns.start()
+
+    async def cog_unload(self):
+        self.evict_idle_cooldowns.cancel()
+        self.spawn_manager.queue.stop()
+
+    @tasks.loop(minutes=5)
+    async def evict_idle_cooldowns(self):
+        if amount := self.spawn_manager.evict_idle(settings.spawn_idle_time):
+            log.debug(f"Forgot the spawn progress of {amount} idle guilds")
+
     async def load_cache(self):
-        amount = 0
-        async for config in GuildConfig.all():
-            if not config.enabled:
-                continue
-            if not config.spawnChannel:
-                continue
-            self.spawn_manager.cache[config.guild_id] = config.spawnChannel
-            amount += 1
-        log.info(f"Loaded {amount} guilds in cache")
+        configs = await self.bot.guild_configs.load()
+        channels = {config.guild_id: config.spawnChannel for config in configs}
+        self.spawn_manager.cache.clear()
+        self.spawn_manager.cache.update(channels)
+        # when reconciling a snapshot, drop the progress of guilds where spawn was disabled
+        for guild_id in self.spawn_manager.cooldowns.keys() - channels.keys():
+            self.spawn_manager.forget(guild_id)
+        log.info(f"Loaded {len(configs)} guilds in cache")
+
+    def restore(self, state: "Snapshot"):
+        self.spawn_manager.cache.update(state.spawn_channels)
+        self.spawn_manager.restore_cooldowns(state.cooldowns)
+        log.info(f"Restored the spawn progress of {len(state.cooldowns)} guilds")
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -41,7 +58,12 @@ class CarFiguresSpawner(commands.Cog):
             return
         if guild.id in self.bot.blacklisted_servers:
             return
-        await self.spawn_manager.handle_message(message)
+        self.spawn_manager.handle_message(message)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.spawn_manager.forget(guild.id)
+        self.spawn_manager.cache.pop(guild.id, None)
 
     @commands.Cog.listener()
     async def on_carfigures_settings_change(
@@ -49,21 +71,21 @@ class CarFiguresSpawner(commands.Cog):
         guild: discord.Guild,
         channel: Optional[discord.TextChannel] = None,
         enabled: Optional[bool] = None,
+        role: Optional[discord.Role] = None,
     ):
+        # the spawn role is read from the configs cache on each spawn, nothing to update
         if guild.id not in self.spawn_manager.cache:
             if enabled is False:
                 return  # do nothing
             if channel:
                 self.spawn_manager.cache[guild.id] = channel.id
             else:
-                try:
-                    config = await GuildConfig.get(guild_id=guild.id)
-                except DoesNotExist:
-                    return
-                else:
+                config = await self.bot.guild_configs.get(guild.id)
+                if config and config.spawnChannel:
                     self.spawn_manager.cache[guild.id] = config.spawnChannel
         else:
             if enabled is False:
                 del self.spawn_manager.cache[guild.id]
+                self.spawn_manager.forget(guild.id)
             elif channel:
                 self.spawn_manager.cache[guild.id] = channel.id
@@ -10,12 +10,14 @@ from discord.ui import Button, Modal, TextInput, View
 from tortoise.timezone import now as datetime_now
 
 from carfigures.core.metrics import caught_cars
-from carfigures.core.models import CarInstance, Player, events, exclusives
+from carfigures.core.models import CarInstance, Player
+from carfigures.core.utils import catchnames
+from carfigures.core.utils.rewards import catch_rewards
 from carfigures.settings import appearance, settings
 
 if TYPE_CHECKING:
     from carfigures.core.bot import CarFiguresBot
-    from carfigures.core.models import Event, Exclusive
+    from carfigures.core.models import Exclusive
     from carfigures.packages.carfigures.carfigure import CarFigure
 
 log = logging.getLogger("carfigures.packages.carfigures.components")
@@ -45,23 +47,27 @@ class CarFigureNamePrompt(Modal):
             )
 
     async def on_submit(self, interaction: discord.Interaction["CarFiguresBot"]):
-        # TODO: use lock
         await interaction.response.defer(thinking=True)
         if self.car.caught:
             await interaction.followup.send(f"{interaction.user.mention} I was caught already!")
             return
-        if self.car.model.catchNames:
-            possible_names = (
-                self.car.name.lower(),
-                *self.car.model.catchNames.split(";"),
-            )
-        else:
-            possible_names = (self.car.name.lower(),)
-        if self.name.value.lower().strip() in possible_names:
-            self.car.caught = True
-            car, has_caught_before = await self.catch_car(
+        if catchnames.index.matches(self.name.value, self.car.model):
+            # claiming doesn't await, only one of the concurrent submissions can win it
+            if not self.car.claim():
+                await interaction.followup.send(
+                    f"{interaction.user.mention} I was caught already!"
+                )
+                return
+            result = await self.catch_car(
                 interaction.client, cast(discord.Member, interaction.user)
             )
+            if result is None:
+                # caught by another process with the same spawn token
+                await interaction.followup.send(
+                    f"{interaction.user.mention} I was caught already!"
+                )
+                return
+            car, has_caught_before = result
 
             event = ""
             if car.exclusive_card and car.exclusive_card.catchPhrase:
@@ -79,62 +85,35 @@ class CarFigureNamePrompt(Modal):
             self.button.disabled = True
             await interaction.followup.edit_message(self.car.message.id, view=self.button.view)
         else:
-            wrong_message = random.choices(
-                population=[message["message"] for message in settings.wrong_name_messages],
-                weights=[float(message["rarity"]) for message in settings.wrong_name_messages],
-                k=1,
-            )[0]
+            wrong_message = settings.wrong_name_messages.sample()
             await interaction.followup.send(f"{interaction.user.mention} " + wrong_message)
 
     async def catch_car(
         self, bot: "CarFiguresBot", user: discord.Member
-    ) -> tuple[CarInstance, bool]:
-        player, _ = await Player.get_or_create(discord_id=user.id)
-
-        event: "Event | None" = None
+    ) -> tuple[CarInstance, bool] | None:
         exclusive: "Exclusive | None" = None
-        chance = random.randint(1, 2048) == 1
-        exclusive_population = [
-            exclusive
-            for exclusive in exclusives.values()
-            if exclusive.rebirthRequired <= player.rebirths
-        ]
-        event_population = [
-            event
-            for event in events.values()
-            if event.startDate <= datetime_now() <= event.endDate
-        ]
-
-        if chance and exclusive_population:
-            common_weight = sum(1 - exclusive.rarity for exclusive in exclusive_population)
-            weights = [exclusive.rarity for exclusive in exclusive_population] + [common_weight]
-            exclusive = random.choices(
-                population=exclusive_population + [None], weights=weights, k=1
-            )[0]
-
-        if event_population:
-            # Here we try to determine what should be the chance of having a common card
-            # since the rarity field is a value between 0 and 1, 1 being no common
-            # and 0 only common, we get the remaining value by doing (1-rarity)
-            # We then sum each value for each current event, and we should get an algorithm
-            # that kinda makes sense.
-            common_weight = sum(1 - event.rarity for event in event_population)
-
-            weights = [event.rarity for event in event_population] + [common_weight]
-            # None is added representing the common carfigure
-            event = random.choices(population=event_population + [None], weights=weights, k=1)[0]
-
-        is_new = not await CarInstance.filter(player=player, car=self.car.model).exists()
-        car = await CarInstance.create(
+        if random.randint(1, 2048) == 1 and catch_rewards.has_exclusives:
+            # only query the rebirths of the player in the rare case they matter
+            rebirths = (
+                await Player.filter(discord_id=user.id).first().values_list("rebirths", flat=True)
+                or 0
+            )
+            exclusive = catch_rewards.exclusive(rebirths)
+        event = catch_rewards.event(datetime_now())
+
+        result = await CarInstance.catch(
+            user.id,
             car=self.car.model,
-            player=player,
             exclusive=exclusive,
             event=event,
             horsepowerBonus=random.randint(*settings.catch_bonus_rate),
             weightBonus=random.randint(*settings.catch_bonus_rate),
             server=user.guild.id,
             spawnedTime=self.car.time,
+            spawnToken=self.car.token,
         )
+        if result is None:
+            return None
         if user.guild.member_count:
             caught_cars.labels(
                 fullName=self.car.model.fullName,
@@ -143,16 +122,12 @@ class CarFigureNamePrompt(Modal):
                 # observe the size of the server, rounded to the nearest power of 10
                 guild_size=10 ** math.ceil(math.log(max(user.guild.member_count - 1, 1), 10)),
             ).inc()
-        return car, is_new
+        return result
 
 
 class CatchButton(Button):
     def __init__(self, car: "CarFigure"):
-        catch_button_message = random.choices(
-            population=[message["message"] for message in settings.catch_button_messages],
-            weights=[float(message["rarity"]) for message in settings.catch_button_messages],
-            k=1,
-        )[0]
+        catch_button_message = settings.catch_button_messages.sample()
         super().__init__(style=discord.ButtonStyle.primary, label=catch_button_message)
         self.car = car
 
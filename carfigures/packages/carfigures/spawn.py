@@ -1,19 +1,127 @@
 import asyncio
 import logging
 import random
-from collections import deque, namedtuple
+import sys
+from array import array
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import cast
+from time import monotonic
+from typing import Awaitable, Callable, KeysView, NamedTuple, cast
 from carfigures.settings import settings
 
 
 import discord
 
+from carfigures.core.metrics import spawn_queue_depth, spawn_queue_dropped, spawn_queue_wait
+from carfigures.core.utils.guildconfigs import GuildConfigCache
+from carfigures.core.utils.ratelimit import TokenBucket
 from carfigures.packages.carfigures.carfigure import CarFigure
 
 log = logging.getLogger("carfigures.packages.carfigures")
-CachedMessage = namedtuple("CachedMessage", ["content", "author_id"])
+
+# time source of the spawn heuristics, replaced by a virtual clock when simulating spawns
+clock: Callable[[], float] = monotonic
+
+
+class MessageWindow:
+    """
+    The most recent messages of a guild, reduced to what the spawn heuristics need: the hash of
+    the lowercased content, the author and the length. No message content is kept.
+
+    Messages are stored in a ring buffer of preallocated arrays, and counters of the content
+    hashes, authors and short messages are updated as messages come in and out, so that adding
+    a message and reading the statistics are O(1).
+
+    Parameters
+    ----------
+    maxlen: int
+        Number of messages kept, the oldest one is evicted when a message is added to a full
+        window.
+    """
+
+    __slots__ = (
+        "maxlen",
+        "hashes",
+        "authors",
+        "lengths",
+        "start",
+        "size",
+        "content_counts",
+        "author_counts",
+        "short_messages",
+    )
+
+    def __init__(self, maxlen: int = 100):
+        self.maxlen = maxlen
+        self.hashes = array("q", bytes(8 * maxlen))
+        self.authors = array("Q", bytes(8 * maxlen))
+        self.lengths = array("H", bytes(2 * maxlen))
+        self.start = 0
+        self.size = 0
+        self.content_counts: Counter[int] = Counter()
+        self.author_counts: Counter[int] = Counter()
+        self.short_messages = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def unique_authors(self) -> KeysView[int]:
+        return self.author_counts.keys()
+
+    def append(self, content: str, author_id: int) -> bool:
+        """
+        Add a message, evicting the oldest one if the window is full.
+
+        Returns
+        -------
+        bool
+            `True` if a message with the same content was already in the window.
+        """
+        content_hash = hash(content.lower())
+        length = min(len(content), 0xFFFF)
+        duplicate = content_hash in self.content_counts
+
+        if self.size == self.maxlen:
+            index = self.start
+            self.start = (self.start + 1) % self.maxlen
+            self._forget(self.hashes[index], self.authors[index], self.lengths[index])
+        else:
+            index = (self.start + self.size) % self.maxlen
+            self.size += 1
+        self.hashes[index] = content_hash
+        self.authors[index] = author_id
+        self.lengths[index] = length
+
+        self.content_counts[content_hash] += 1
+        self.author_counts[author_id] += 1
+        if length < 5:
+            self.short_messages += 1
+        return duplicate
+
+    def _forget(self, content_hash: int, author_id: int, length: int):
+        self.content_counts[content_hash] -= 1
+        if not self.content_counts[content_hash]:
+            del self.content_counts[content_hash]
+        self.author_counts[author_id] -= 1
+        if not self.author_counts[author_id]:
+            del self.author_counts[author_id]
+        if length < 5:
+            self.short_messages -= 1
+
+    def memory_size(self) -> int:
+        """
+        Estimate of the number of bytes used by the window.
+        """
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.hashes)
+            + sys.getsizeof(self.authors)
+            + sys.getsizeof(self.lengths)
+            + sys.getsizeof(self.content_counts)
+            + sys.getsizeof(self.author_counts)
+        )
 
 
 @dataclass
@@ -31,71 +139,229 @@ class SpawnCooldown:
         point, a car will be spawned next.
     chance: int
         The number `amount` has to reach for spawn. Determined randomly.
-    lock: asyncio.Lock
-        Used to rate-limit messages and ignore fast spam
-    message_cache: ~collections.deque[CachedMessage]
-        A list of recent messages used to reduce the spawn chance when too few different chatters
+    next_increase: float
+        Monotonic time before which messages don't increase `scaled_message_count`, used to
+        rate-limit messages and ignore fast spam
+    message_cache: MessageWindow
+        The recent messages used to reduce the spawn chance when too few different chatters
         are present. Limited to the 100 most recent messages in the guild.
+    last_message: float
+        Monotonic time of the last message received, used to forget idle guilds.
     """
 
     time: datetime
-    # initialize partially started, to reduce the dead time after starting the bot
+    # initialize partially started, to reduce the dead time after starting the bot. The offset is
+    # random so that the guilds don't all reach their goal at once after a restart
     scaled_message_count: float = field(
-        default_factory=lambda: float(settings.required_message_range[0] // 2)
+        default_factory=lambda: random.uniform(0, settings.required_message_range[0])
     )
-    cached_messages_set: set[str] = field(default_factory=set)
     chance: int = field(default_factory=lambda: random.randint(*settings.required_message_range))
-    lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False)
-    message_cache: deque[CachedMessage] = field(default_factory=lambda: deque(maxlen=100))
-    unique_authors: set[int] = field(default_factory=set)
+    next_increase: float = field(default=0.0, init=False)
+    message_cache: MessageWindow = field(default_factory=MessageWindow)
+    last_message: float = field(default_factory=lambda: clock(), init=False)
+
+    @property
+    def on_cooldown(self) -> bool:
+        """
+        Whether messages are currently ignored because one was counted recently.
+        """
+        return clock() < self.next_increase
 
     def reset(self, time: datetime):
         self.scaled_message_count = 1.0
         self.chance = random.randint(*settings.required_message_range)
-        try:
-            self.lock.release()
-        except RuntimeError:  # lock is not acquired
-            pass
+        self.next_increase = 0.0
         self.time = time
 
-    async def increase(self, message: discord.Message) -> bool:
-        # this is a deque, not a list
-        # its property is that, once the max length is reached (100 for us),
-        # the oldest element is removed, thus we only have the last 100 messages in memory
-        self.message_cache.append(
-            CachedMessage(content=message.content, author_id=message.author.id)
+    def cache_message(self, message: discord.Message) -> bool:
+        """
+        Add the message to `message_cache`.
+
+        Returns
+        -------
+        bool
+            `True` if a message with the same content was already in the cache.
+        """
+        self.last_message = clock()
+        return self.message_cache.append(message.content, message.author.id)
+
+    def memory_size(self) -> int:
+        """
+        Estimate of the number of bytes used by this object and its message cache.
+        """
+        return (
+            sys.getsizeof(self) + sys.getsizeof(self.__dict__) + self.message_cache.memory_size()
         )
 
-        if self.lock.locked():
+    def message_multiplier(self, message: discord.Message, duplicate: bool) -> float:
+        """
+        Points given by a message once cached, halved by each penalty that applies.
+        """
+        message_multiplier = 1
+        if duplicate:
+            message_multiplier /= 2
+        if message.guild.member_count > 1000:  # type: ignore
+            message_multiplier /= 2
+        if len(message.content) < 5:
+            message_multiplier /= 2
+        if (datetime.now(timezone.utc) - message.author.created_at).days < 7:
+            message_multiplier /= 2
+        window = self.message_cache
+        if (
+            len(window.unique_authors) < 4
+            or window.author_counts[message.author.id] / window.maxlen > 0.4
+        ):
+            message_multiplier /= 2
+        return message_multiplier
+
+    def increase(self, message: discord.Message) -> bool:
+        duplicate = self.cache_message(message)
+
+        now = clock()
+        if now < self.next_increase:
             return False
 
-        async with self.lock:
-            message_multiplier = 1
-            if message.content.lower() in [m.content.lower() for m in self.message_cache]:
-                message_multiplier /= 2
-            if message.guild.member_count > 1000:  # type: ignore
-                message_multiplier /= 2
-            if len(message.content) < 5:
-                message_multiplier /= 2
-            if (datetime.now(timezone.utc) - message.author.created_at).days < 7:
-                message_multiplier /= 2
-            if len(self.unique_authors) < 4 or (
-                len(list(filter(lambda x: x.author_id == message.author.id, self.message_cache)))
-                / self.message_cache.maxlen  # type: ignore
-                > 0.4
-            ):
-                message_multiplier /= 2
-            self.scaled_message_count += message_multiplier
-            await asyncio.sleep(10)
+        self.scaled_message_count += self.message_multiplier(message, duplicate)
+        self.next_increase = now + 10
         return True
 
 
+class SpawnJob(NamedTuple):
+    guild: discord.Guild
+    channel_id: int
+    queued_at: float
+
+
+class SpawnQueue:
+    """
+    Bounded queue of the spawns decided by the manager, sent by a pool of workers so that slow
+    uploads never hold up the processing of messages.
+
+    A channel has at most one spawn queued or being sent, the others are dropped, as are the
+    spawns submitted while the queue is full.
+
+    Parameters
+    ----------
+    spawn: Callable[[discord.Guild], Awaitable[None]]
+        Coroutine function sending a spawn in the guild.
+    workers: int
+        Number of spawns sent at the same time.
+    maxsize: int
+        Maximum number of spawns waiting for a worker.
+    """
+
+    def __init__(
+        self,
+        spawn: Callable[[discord.Guild], Awaitable[None]],
+        workers: int = 4,
+        maxsize: int = 100,
+    ):
+        self.spawn = spawn
+        self.workers = workers
+        self.queue: asyncio.Queue[SpawnJob] = asyncio.Queue(maxsize)
+        self.pending: set[int] = set()
+        self.tasks: list[asyncio.Task] = []
+
+    def start(self):
+        if self.tasks:
+            return
+        self.tasks = [
+            asyncio.create_task(self._worker(), name=f"spawn-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    def stop(self):
+        """
+        Cancel the workers, the spawns still in queue are dropped.
+        """
+        for task in self.tasks:
+            task.cancel()
+        self.tasks.clear()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.pending.clear()
+        spawn_queue_depth.set(0)
+
+    def submit(self, guild: discord.Guild, channel_id: int) -> bool:
+        """
+        Queue a spawn without waiting, and return whether it was accepted.
+        """
+        if channel_id in self.pending:
+            spawn_queue_dropped.labels(reason="duplicate").inc()
+            return False
+        try:
+            self.queue.put_nowait(SpawnJob(guild, channel_id, monotonic()))
+        except asyncio.QueueFull:
+            spawn_queue_dropped.labels(reason="full").inc()
+            log.warning(f"Spawn queue full, dropped the spawn of {guild.name} ({guild.id})")
+            return False
+        self.pending.add(channel_id)
+        spawn_queue_depth.set(self.queue.qsize())
+        return True
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            spawn_queue_depth.set(self.queue.qsize())
+            spawn_queue_wait.observe(monotonic() - job.queued_at)
+            try:
+                await self.spawn(job.guild)
+            except Exception:
+                log.exception(f"Failed to spawn in {job.guild.name} ({job.guild.id})")
+            finally:
+                self.pending.discard(job.channel_id)
+                self.queue.task_done()
+
+
 @dataclass
 class SpawnManager:
+    configs: GuildConfigCache
     cooldowns: dict[int, SpawnCooldown] = field(default_factory=dict)
     cache: dict[int, int] = field(default_factory=dict)
+    queue: SpawnQueue = field(init=False)
+    rate_limit: TokenBucket = field(init=False)
+
+    def __post_init__(self):
+        self.queue = SpawnQueue(
+            self.spawn_carfigure, settings.spawn_workers, settings.spawn_queue_size
+        )
+        self.rate_limit = TokenBucket(settings.spawn_rate, settings.spawn_burst)
+
+    def forget(self, guild_id: int):
+        """
+        Drop the spawn progress of a guild.
+        """
+        self.cooldowns.pop(guild_id, None)
 
-    async def handle_message(self, message: discord.Message):
+    def dump_cooldowns(self) -> dict[int, tuple[datetime, float, int]]:
+        """
+        Spawn progress of each guild, to be restored with `restore_cooldowns` after a restart.
+        """
+        return {
+            guild_id: (cooldown.time, cooldown.scaled_message_count, cooldown.chance)
+            for guild_id, cooldown in self.cooldowns.items()
+        }
+
+    def restore_cooldowns(self, cooldowns: dict[int, tuple[datetime, float, int]]):
+        for guild_id, (time, scaled_message_count, chance) in cooldowns.items():
+            self.cooldowns[guild_id] = SpawnCooldown(time, scaled_message_count, chance)
+
+    def evict_idle(self, idle_time: float) -> int:
+        """
+        Drop the spawn progress of the guilds without messages for `idle_time` seconds, and
+        return how many were dropped.
+        """
+        limit = clock() - idle_time
+        idle = [id for id, cooldown in self.cooldowns.items() if cooldown.last_message < limit]
+        for guild_id in idle:
+            del self.cooldowns[guild_id]
+        return len(idle)
+
+    def handle_message(self, message: discord.Message):
+        """
+        Count the message towards the next spawn of its guild, and queue the spawn once the goal
+        is reached. The spawn itself is sent later by the workers of `queue`.
+        """
         guild = message.guild
         if not guild:
             return
@@ -117,8 +383,8 @@ class SpawnManager:
             multiplier = 0.2
         chance = cooldown.chance - multiplier * (deltaTime // 60)
 
-        # manager cannot be increased more than once per 5 seconds
-        if not await cooldown.increase(message):
+        # manager cannot be increased more than once per 10 seconds
+        if not cooldown.increase(message):
             return
 
         # normal increase, need to reach goal
@@ -132,16 +398,19 @@ class SpawnManager:
 
         # spawn carfigure
         cooldown.reset(message.created_at)
-        await self.spawn_carfigure(
-            guild
-        ) if guild.member_count > settings.minimum_members_required else log.warning(
-            f"{guild.name} ({guild.id}) is trying to farm."
-        )
+        if guild.member_count > settings.minimum_members_required:
+            self.queue.submit(guild, self.cache[guild.id])
+        else:
+            log.warning(f"{guild.name} ({guild.id}) is trying to farm.")
 
     async def spawn_carfigure(self, guild: discord.Guild):
-        channel = guild.get_channel(self.cache[guild.id])
+        # the spawn may have been disabled while queued
+        channel_id = self.cache.get(guild.id)
+        if channel_id is None:
+            return
+        channel = guild.get_channel(channel_id)
         if not channel:
-            log.warning(f"Lost channel {self.cache[guild.id]} for guild {guild.name}.")
+            log.warning(f"Lost channel {channel_id} for guild {guild.name}.")
             del self.cache[guild.id]
             return
         if not channel.permissions_for(guild.me).send_messages:
@@ -150,5 +419,7 @@ class SpawnManager:
             )
             return
 
+        # smooth the uploads of all guilds to stay under the global rate limits of Discord
+        await self.rate_limit.acquire()
         car = await CarFigure.get_random()
-        await car.spawn(cast(discord.TextChannel, channel))
+        await car.spawn(cast(discord.TextChannel, channel), self.configs.get_cached(guild.id))
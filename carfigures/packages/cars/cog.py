@@ -26,6 +26,7 @@ from carfigures.packages.cars.components import (
     DonationRequest,
     CarFiguresViewer,
     inventory_privacy_checker,
+    send_carfigure,
 )
 from carfigures.settings import settings, appearance
 
@@ -279,9 +280,7 @@ class Cars(commands.GroupCog, group_name=appearance.cars):
             The carfigure you want to inspect
         """
         await interaction.response.defer(thinking=True)
-        content, file = await carfigure.prepare_for_message(interaction)
-        await interaction.followup.send(content=content, file=file)
-        file.close()
+        await send_carfigure(interaction, carfigure)
 
     @app_commands.command(name=appearance.info_name, description=appearance.info_desc)
     @app_commands.checks.cooldown(1, 5, key=lambda i: i.user.id)
@@ -354,9 +353,7 @@ class Cars(commands.GroupCog, group_name=appearance.cars):
             )
             return
 
-        content, file = await carfigure.prepare_for_message(interaction)
-        await interaction.followup.send(content=content, file=file)
-        file.close()
+        await send_carfigure(interaction, carfigure)
 
     @app_commands.command()
     async def favorite(
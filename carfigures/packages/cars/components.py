@@ -5,6 +5,7 @@ import enum
 
 import discord
 from discord.ui import Button, View, button
+from discord.utils import MISSING
 
 from carfigures.core.models import (
     CarInstance,
@@ -95,6 +96,43 @@ class DonationRequest(View):
         await self.carfigure.unlock()
 
 
+class FullCardView(View):
+    """
+    Button sending the full resolution card of a carfigure shown as a preview.
+    """
+
+    def __init__(self, interaction: discord.Interaction["CarFiguresBot"], carfigure: CarInstance):
+        super().__init__(timeout=300)
+        self.original_interaction = interaction
+        self.carfigure = carfigure
+
+    async def on_timeout(self):
+        try:
+            await self.original_interaction.edit_original_response(view=None)
+        except discord.HTTPException:
+            pass
+
+    @button(label="Full size", style=discord.ButtonStyle.secondary)
+    async def full_size(self, interaction: discord.Interaction["CarFiguresBot"], button: Button):
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        file = await self.carfigure.card_file(interaction.client, "full")
+        await interaction.followup.send(file=file, ephemeral=True)
+        file.close()
+
+
+async def send_carfigure(
+    interaction: discord.Interaction["CarFiguresBot"], carfigure: CarInstance
+):
+    """
+    Send a carfigure's card in response to a deferred interaction, with a button to get the
+    full resolution card when previews are sent.
+    """
+    content, file = await carfigure.prepare_for_message(interaction)
+    view = FullCardView(interaction, carfigure) if settings.card_tier == "preview" else MISSING
+    await interaction.followup.send(content=content, file=file, view=view)
+    file.close()
+
+
 class SortingChoices(enum.Enum):
     alphabetic = "car__fullName"
     catchDate = "-catchDate"
@@ -162,9 +200,7 @@ class CarFiguresSelector(Pages):
 
 class CarFiguresViewer(CarFiguresSelector):
     async def car_selected(self, interaction: discord.Interaction, instance: CarInstance):
-        content, file = await instance.prepare_for_message(interaction)
-        await interaction.followup.send(content=content, file=file)
-        file.close()
+        await send_carfigure(interaction, instance)
 
 
 async def inventory_privacy_checker(
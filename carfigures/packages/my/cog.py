@@ -402,10 +402,10 @@ class My(commands.GroupCog):
                 ephemeral=True,
             )
             return
-        config, _ = await models.GuildConfig.get_or_create(guild_id=interaction.guild_id)
+        config = await self.bot.guild_configs.get_or_create(guild.id)
         if config.enabled:
             config.enabled = False  # type: ignore
-            await config.save()
+            await self.bot.guild_configs.save(config)
             self.bot.dispatch("carfigures_settings_change", guild, enabled=False)
             await interaction.response.send_message(
                 f"{settings.bot_name} is now disabled in this server. Commands will still be "
@@ -414,7 +414,7 @@ class My(commands.GroupCog):
             )
         else:
             config.enabled = True  # type: ignore
-            await config.save()
+            await self.bot.guild_configs.save(config)
             self.bot.dispatch("carfigures_settings_change", guild, enabled=True)
             if config.spawnChannel and (channel := guild.get_channel(config.spawnChannel)):
                 await interaction.response.send_message(
@@ -432,7 +432,7 @@ class My(commands.GroupCog):
         """
         Set the role spawn alert for your server
         """
-
+        guild = cast(discord.Guild, interaction.guild)  # guild-only command
         user = cast(discord.Member, interaction.user)
         if not user.guild_permissions.manage_guild:
             await interaction.response.send_message(
@@ -440,16 +440,18 @@ class My(commands.GroupCog):
                 ephemeral=True,
             )
             return
-        config, _ = await models.GuildConfig.get_or_create(guild_id=interaction.guild_id)
+        config = await self.bot.guild_configs.get_or_create(guild.id)
         if config.spawnRole == role.id:
             config.spawnRole = None  # type: ignore
-            await config.save()
+            await self.bot.guild_configs.save(config)
+            self.bot.dispatch("carfigures_settings_change", guild, role=None)
             await interaction.response.send_message(
                 f"{settings.bot_name} will no longer alert {role.mention} when {appearance.collectible_plural} spawn."
             )
         else:
             config.spawnRole = role.id
-            await config.save()
+            await self.bot.guild_configs.save(config)
+            self.bot.dispatch("carfigures_settings_change", guild, role=role)
             await interaction.response.send_message(
                 f"{settings.bot_name} will now alert {role.mention} when {appearance.collectible_plural} spawn."
             )
@@ -463,7 +465,7 @@ class My(commands.GroupCog):
         """
 
         guild = cast(discord.Guild, interaction.guild)
-        config = await models.GuildConfig.get(guild_id=guild.id)
+        config = await self.bot.guild_configs.get_or_create(guild.id)
         embed = discord.Embed(
             title=f"❖ {guild.name} Server Info",
             color=settings.default_embed_color,
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import discord
 from discord.ui import Button, View, button
 
-from carfigures.core import models
 from carfigures.settings import settings, information, appearance
 
+if TYPE_CHECKING:
+    from carfigures.core.bot import CarFiguresBot
+
 
 activation_embed = discord.Embed(
     colour=settings.default_embed_color,
@@ -48,10 +52,12 @@ class AcceptTOSView(View):
         style=discord.ButtonStyle.success,
         emoji="\N{HEAVY CHECK MARK}\N{VARIATION SELECTOR-16}",
     )
-    async def accept_button(self, interaction: discord.Interaction, item: discord.ui.Button):
-        config, _ = await models.GuildConfig.get_or_create(guild_id=interaction.guild_id)
+    async def accept_button(
+        self, interaction: discord.Interaction["CarFiguresBot"], item: discord.ui.Button
+    ):
+        config = await interaction.client.guild_configs.get_or_create(interaction.guild_id)
         config.spawnChannel = self.channel.id  # type: ignore
-        await config.save()
+        await interaction.client.guild_configs.save(config)
         interaction.client.dispatch(
             "carfigures_settings_change", interaction.guild, channel=self.channel
         )
@@ -219,20 +219,13 @@ class SuperUser(commands.GroupCog, group_name=appearance.sudo):
         penalties: list[str] = []
         if guild.member_count < 5 or guild.member_count > 1000:
             penalties.append("Server has less than 5 or more than 1000 members")
-        if any(len(x.content) < 5 for x in cooldown.message_cache):
+        window = cooldown.message_cache
+        if window.short_messages:
             penalties.append("Some cached messages are less than 5 characters long")
 
-        authors_set = set(x.author_id for x in cooldown.message_cache)
-        low_chatters = len(authors_set) < 4
+        low_chatters = len(window.unique_authors) < 4
         # check if one author has more than 40% of messages in cache
-        major_chatter = any(
-            (
-                len(list(filter(lambda x: x.author_id == author, cooldown.message_cache)))
-                / cooldown.message_cache.maxlen  # type: ignore
-                > 0.4
-            )
-            for author in authors_set
-        )
+        major_chatter = max(window.author_counts.values(), default=0) / window.maxlen > 0.4
         # this mess is needed since either conditions make up to a single penality
         if low_chatters:
             if not major_chatter:
@@ -267,7 +260,7 @@ class SuperUser(commands.GroupCog, group_name=appearance.sudo):
         )
 
         information: list[str] = []
-        if cooldown.lock.locked():
+        if cooldown.on_cooldown:
             information.append("The manager is currently on cool down.")
         if delta < 600:
             information.append(
@@ -339,8 +332,9 @@ class SuperUser(commands.GroupCog, group_name=appearance.sudo):
             return
 
         entries: list[tuple[str, str]] = []
+        configs = await self.bot.guild_configs.get_many(guild.id for guild in guilds)
         for guild in guilds:
-            if config := await models.GuildConfig.get_or_none(guild_id=guild.id):
+            if config := configs[guild.id]:
                 spawn_enabled = config.enabled and config.guild_id
             else:
                 spawn_enabled = False
@@ -786,7 +780,7 @@ class SuperUser(commands.GroupCog, group_name=appearance.sudo):
                     )
                     return
 
-                if config := await models.GuildConfig.get_or_none(guild_id=guild.id):
+                if config := await self.bot.guild_configs.get(guild.id):
                     spawn_enabled = config.enabled and config.guild_id
                 else:
                     spawn_enabled = False
@@ -4,6 +4,8 @@ from typing import TYPE_CHECKING
 
 import tomllib
 
+from carfigures.core.utils.sampling import AliasSampler
+
 if TYPE_CHECKING:
     from pathlib import Path
 
@@ -34,6 +36,48 @@ class Settings:
         List of roles that have full access to the admin commands
     supers: list[int]
         List of roles that have partial access to the admin commands (only blacklist and guilds)
+    spawn_idle_time: int
+        Seconds without messages after which the spawn progress of a server is forgotten
+    spawn_workers: int
+        Number of spawns sent at the same time, the next ones wait in queue
+    spawn_queue_size: int
+        Maximum number of spawns waiting in queue, the next ones are dropped
+    spawn_rate: float
+        Average number of spawns per second across all servers, 0 disables the limit
+    spawn_burst: int
+        Number of spawns that can be sent at once above `spawn_rate` after a quiet period
+    image_cache_size: int
+        Memory budget in MiB for the decoded images and pre-drawn layers used to draw cards
+    render_mode: str
+        "thread" or "process", whether cards are drawn in threads or in separate processes
+    render_workers: int | None
+        Number of threads or processes drawing cards, defaults to the number of CPUs
+    render_max_in_flight: int
+        Number of cards drawn at the same time, the next ones wait in queue
+    card_cache_path: str
+        Directory where rendered cards are kept to be sent again without drawing them
+    card_cache_size: int
+        Maximum size in MiB of the rendered cards directory, 0 disables it
+    card_tier: str
+        "preview" or "full", the resolution of the cards sent in chat. Preview cards come
+        with a button to get the full resolution one
+    preview_scale: float
+        Scale of the preview cards compared to the full resolution ones
+    image_format: str
+        "png" or "webp", the format of the cards and banners sent
+    png_compress_level: int
+        zlib level of PNG images, from 0 (fastest) to 9 (smallest)
+    png_quantize: bool
+        Whether PNG images are reduced to a 256 colors palette
+    webp_lossless: bool
+        Whether WebP images are lossless
+    webp_quality: int
+        Quality of lossy WebP images, or compression effort of lossless ones, from 0 to 100
+    snapshot_path: str | None
+        File where the caches and the spawn progress are saved to restart faster, `None`
+        disables it
+    snapshot_interval: int
+        Seconds between two snapshots, one is also written when the bot stops
     """
 
     bot_token: str = ""
@@ -44,19 +88,43 @@ class Settings:
     max_favorites: int = 50
     default_embed_color: int = 0
 
-    spawn_messages: list[dict[str, str]] = field(default_factory=list[dict[str, str]])
+    spawn_messages: AliasSampler[str] = field(default_factory=AliasSampler)
     required_message_range: list[int] = field(default_factory=list)
     catch_bonus_rate: list[int] = field(default_factory=list)
-    wrong_name_messages: list[dict[str, str]] = field(default_factory=list[dict[str, str]])
-    catch_button_messages: list[dict[str, str]] = field(default_factory=list[dict[str, str]])
+    wrong_name_messages: AliasSampler[str] = field(default_factory=AliasSampler)
+    catch_button_messages: AliasSampler[str] = field(default_factory=AliasSampler)
     cooldown_time: int = 0
     minimum_members_required: int = 0
+    spawn_idle_time: int = 3600
+    spawn_workers: int = 4
+    spawn_queue_size: int = 100
+    spawn_rate: float = 5.0
+    spawn_burst: int = 20
 
     superguilds: list[int] = field(default_factory=list)
     superusers: list[int] = field(default_factory=list)
     log_channel: int | None = None
     roots: list[int] = field(default_factory=list)
 
+    # card rendering
+    image_cache_size: int = 256
+    render_mode: str = "thread"
+    render_workers: int | None = None
+    render_max_in_flight: int = 32
+    card_cache_path: str = "./cache/cards"
+    card_cache_size: int = 1024
+    card_tier: str = "preview"
+    preview_scale: float = 0.5
+    image_format: str = "png"
+    png_compress_level: int = 6
+    png_quantize: bool = False
+    webp_lossless: bool = False
+    webp_quality: int = 90
+
+    # warm restarts
+    snapshot_path: str | None = None
+    snapshot_interval: int = 300
+
     # metrics and prometheus
     prometheusEnabled: bool = False
     prometheusHost: str = "0.0.0.0"
@@ -131,6 +199,21 @@ appearance = Appearance()
 information = Information()
 
 
+def message_pool(name: str, messages: list[dict]) -> AliasSampler[str]:
+    """
+    Compile a list of `{ message = "...", rarity = 1 }` tables into a sampler.
+    """
+    if not messages:
+        raise ValueError(f"{name} must contain at least one message")
+    try:
+        weights = [float(message["rarity"]) for message in messages]
+        return AliasSampler([str(message["message"]) for message in messages], weights)
+    except KeyError as e:
+        raise ValueError(f"Every message of {name} needs a {e.args[0]}") from None
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid rarity in {name}: {e}") from None
+
+
 def read_settings(path: "Path"):
     with open(path, "rb") as f:
         config = tomllib.load(f)
@@ -144,17 +227,59 @@ def read_settings(path: "Path"):
 
     settings.required_message_range = config["spawn-manager"]["requiredMessageRange"]
     settings.catch_bonus_rate = config["spawn-manager"]["catchBonusRate"]
-    settings.wrong_name_messages = config["spawn-manager"]["wrongNameMessages"]
-    settings.catch_button_messages = config["spawn-manager"]["catchButtonMessages"]
-    settings.spawn_messages = config["spawn-manager"]["spawnMessages"]
+    settings.wrong_name_messages = message_pool(
+        "wrongNameMessages", config["spawn-manager"]["wrongNameMessages"]
+    )
+    settings.catch_button_messages = message_pool(
+        "catchButtonMessages", config["spawn-manager"]["catchButtonMessages"]
+    )
+    settings.spawn_messages = message_pool(
+        "spawnMessages", config["spawn-manager"]["spawnMessages"]
+    )
     settings.cooldown_time = config["spawn-manager"]["cooldownTime"]
     settings.minimum_members_required = config["spawn-manager"]["minimumMembersRequired"]
+    settings.spawn_idle_time = config["spawn-manager"].get("idleTime", 3600)
+    settings.spawn_workers = config["spawn-manager"].get("workers", 4)
+    settings.spawn_queue_size = config["spawn-manager"].get("queueSize", 100)
+    settings.spawn_rate = config["spawn-manager"].get("spawnRate", 5.0)
+    settings.spawn_burst = config["spawn-manager"].get("spawnBurst", 20)
 
     settings.superguilds = config["team"]["superGuilds"]
     settings.roots = config["team"]["roots"]
     settings.superusers = config["team"]["superUsers"]
     settings.log_channel = config["team"]["logChannel"]
 
+    render = config.get("render", {})
+    settings.image_cache_size = render.get("imageCacheSize", 256)
+    settings.render_mode = render.get("mode", "thread")
+    settings.render_workers = render.get("workers", None)
+    settings.render_max_in_flight = render.get("maxInFlight", 32)
+    settings.card_cache_path = render.get("cardCachePath", "./cache/cards")
+    settings.card_cache_size = render.get("cardCacheSize", 1024)
+    settings.card_tier = render.get("defaultTier", "preview")
+    if settings.card_tier not in ("full", "preview"):
+        raise ValueError(
+            f'Unknown render.defaultTier "{settings.card_tier}", expected "full" or "preview"'
+        )
+    settings.preview_scale = render.get("previewScale", 0.5)
+    if not isinstance(settings.preview_scale, (int, float)) or settings.preview_scale <= 0:
+        raise ValueError(
+            f"render.previewScale must be a positive number, got {settings.preview_scale!r}"
+        )
+    settings.image_format = render.get("format", "png")
+    settings.png_compress_level = render.get("compressLevel", 6)
+    settings.png_quantize = render.get("quantize", False)
+    settings.webp_lossless = render.get("webpLossless", False)
+    settings.webp_quality = render.get("webpQuality", 90)
+    # imported here, the imagers module depends on this one
+    from carfigures.core.utils.imagers import Encoder
+
+    Encoder.from_settings()
+
+    snapshot = config.get("snapshot", {})
+    settings.snapshot_path = snapshot.get("path", None)
+    settings.snapshot_interval = snapshot.get("interval", 300)
+
     settings.prometheusEnabled = config["prometheus"]["enabled"]
     settings.prometheusHost = config["prometheus"]["host"]
     settings.prometheusPort = config["prometheus"]["port"]
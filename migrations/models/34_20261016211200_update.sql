@@ -0,0 +1,5 @@
+-- upgrade --
+ALTER TABLE "carinstance" ADD "spawnToken" UUID UNIQUE;
+COMMENT ON COLUMN "carinstance"."spawnToken" IS 'Token of the spawn this car was caught from, only one catch per spawn';
+-- downgrade --
+ALTER TABLE "carinstance" DROP COLUMN "spawnToken";
@@ -0,0 +1,5 @@
+-- upgrade --
+ALTER TABLE "car" ADD "catchTolerance" INT NOT NULL  DEFAULT 0;
+COMMENT ON COLUMN "car"."catchTolerance" IS 'Number of typos allowed in the name when catching this car';
+-- downgrade --
+ALTER TABLE "car" DROP COLUMN "catchTolerance";